@@ -2,12 +2,15 @@
 # No business logic or API calls here
 
 import os
-from datetime import datetime, date
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 
 import db
+import etl
 import config
 
 # Page config
@@ -17,19 +20,81 @@ st.set_page_config(
     layout="wide",
 )
 
-# Load secrets into environment
+# Shared one-time initialization - cache_resource so secrets loading runs
+# once per server process, not on every rerun (or page, if more are added)
+@st.cache_resource
+def _init_env():
+    try:
+        for key in ["SUPABASE_URL", "SUPABASE_KEY", "ANTHROPIC_API_KEY"]:
+            if key in st.secrets:
+                os.environ[key] = st.secrets[key]
+    except FileNotFoundError:
+        pass  # No secrets file yet
+    return True
+
+
+_init_env()
+
+
+# Hold the Supabase client as a cache_resource so the connection survives
+# reruns and hot-reloads explicitly. db.py keeps its own module-level
+# singleton (it is shared with the FastAPI backend and stays Streamlit-free);
+# this wrapper just pins that instance to the server process lifetime.
+@st.cache_resource
+def _db_client():
+    return db.get_client()
+
+
 try:
-    for key in ["SUPABASE_URL", "SUPABASE_KEY", "ANTHROPIC_API_KEY"]:
-        if key in st.secrets:
-            os.environ[key] = st.secrets[key]
-except FileNotFoundError:
-    pass  # No secrets file yet
+    _db_client()
+except ValueError:
+    pass  # Secrets not configured yet; db calls below will surface the error
 
 st.title("📊 Sales Intelligence Tracker")
 
+
+# Cached read wrappers - Streamlit reruns the whole script on every widget
+# interaction, so serve repeat reads from memory instead of round-tripping
+# to Supabase each time. Cleared after any mutation so the next rerun refetches.
+@st.cache_data(ttl=60)
+def _cached_companies():
+    return db.get_companies()
+
+
+@st.cache_data(ttl=60)
+def _cached_dashboard_data(days: int, exclude_contacted_days: int = 0, exclude_snoozed_days: int = 0):
+    """Fetch the pain summary and financials concurrently on cache miss.
+
+    The two reads are independent, so overlapping them makes a cold render
+    pay max() of their latencies instead of the sum. Workers call plain db
+    helpers only - no Streamlit API touches off the main thread.
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        summary_future = executor.submit(
+            db.get_company_pain_summary,
+            days=days,
+            exclude_contacted_days=exclude_contacted_days,
+            exclude_snoozed_days=exclude_snoozed_days,
+        )
+        financials_future = executor.submit(db.get_company_financials)
+        return summary_future.result(), financials_future.result()
+
+
+@st.cache_data
+def _to_csv(df: pd.DataFrame) -> bytes:
+    """Serialize the export table once per unique content (Streamlit hashes the df)."""
+    return df.to_csv(index=False).encode()
+
+
+def _clear_data_caches():
+    """Invalidate cached reads after a mutation (add company, outreach, pipeline)."""
+    _cached_companies.clear()
+    _cached_dashboard_data.clear()
+
+
 # Load companies once for reuse
 try:
-    companies = db.get_companies()
+    companies = _cached_companies()
 except Exception:
     companies = []
 
@@ -46,6 +111,7 @@ with st.sidebar:
         if submitted and new_name:
             try:
                 db.add_company(new_name, new_ticker or None)
+                _clear_data_caches()
                 st.success(f"Added {new_name}")
                 st.rerun()
             except Exception as e:
@@ -66,8 +132,8 @@ with st.sidebar:
     if st.button("🔄 Run Pipeline", disabled=len(companies) == 0):
         with st.spinner("Fetching news and classifying..."):
             try:
-                import etl
                 stats = etl.run_pipeline()
+                _clear_data_caches()
                 st.success(
                     f"Done! Fetched {stats['articles_fetched']} articles, "
                     f"{stats['articles_new']} new, "
@@ -83,8 +149,8 @@ with st.sidebar:
     if st.button("📈 Refresh Financials", disabled=len(companies) == 0):
         with st.spinner("Fetching stock data..."):
             try:
-                import etl
                 stats = etl.refresh_financials()
+                _clear_data_caches()
                 st.success(
                     f"Done! Refreshed {stats['companies_refreshed']} companies"
                     + (f", {stats['companies_failed']} failed" if stats['companies_failed'] > 0 else "")
@@ -99,20 +165,25 @@ with st.sidebar:
     if st.button("🗑️ Clear All Signals", type="secondary"):
         try:
             stats = db.clear_signals_and_articles()
+            _clear_data_caches()
             st.success(f"Cleared {stats['signals']} signals and {stats['articles']} articles.")
             st.rerun()
         except Exception as e:
             st.error(f"Error: {e}")
 
 
+# Bind per-rerun constants to module-level names once; avoids repeated
+# config attribute + dict lookups inside the per-company hot path
+_HOT = config.URGENCY_THRESHOLDS["hot"]
+_WARM = config.URGENCY_THRESHOLDS["warm"]
+_EARNINGS_URGENCY_DAYS = config.EARNINGS_URGENCY_DAYS
+
+
 def compute_urgency(pain_score: float, age_hours: float) -> str:
     """Determine urgency level based on pain score and signal age."""
-    hot = config.URGENCY_THRESHOLDS["hot"]
-    warm = config.URGENCY_THRESHOLDS["warm"]
-
-    if pain_score >= hot["min_pain"] and age_hours <= hot["max_hours"]:
+    if pain_score >= _HOT["min_pain"] and age_hours <= _HOT["max_hours"]:
         return "hot"
-    elif pain_score >= warm["min_pain"] or age_hours <= warm["max_hours"]:
+    elif pain_score >= _WARM["min_pain"] or age_hours <= _WARM["max_hours"]:
         return "warm"
     return "cold"
 
@@ -128,9 +199,9 @@ def compute_enhanced_urgency(pain_score: float, age_hours: float, next_earnings:
     # Check earnings proximity for urgency boost
     if next_earnings:
         try:
-            earnings_date = datetime.strptime(next_earnings, "%Y-%m-%d").date()
+            earnings_date = date.fromisoformat(next_earnings)
             days_to_earnings = (earnings_date - date.today()).days
-            if 0 <= days_to_earnings <= config.EARNINGS_URGENCY_DAYS:
+            if 0 <= days_to_earnings <= _EARNINGS_URGENCY_DAYS:
                 if base_urgency == "warm":
                     return "hot"  # Boost warm to hot when earnings are imminent
         except (ValueError, TypeError):
@@ -139,6 +210,31 @@ def compute_enhanced_urgency(pain_score: float, age_hours: float, next_earnings:
     return base_urgency
 
 
+def compute_urgencies_vectorized(pain_scores: list, age_hours: list, next_earnings: list) -> list:
+    """Classify urgency for all companies at once with NumPy masks.
+
+    Vectorized equivalent of compute_enhanced_urgency: one pd.to_datetime
+    parse for all earnings dates, then np.select over hot/warm masks with
+    the earnings-proximity boost applied to warm companies.
+    """
+    pain = np.asarray(pain_scores, dtype=float)
+    age = np.asarray(age_hours, dtype=float)
+
+    # Parse all earnings dates in one pass; unparseable/missing become NaT -> NaN days
+    earnings = pd.to_datetime(list(next_earnings), errors="coerce")
+    days_to_earnings = np.asarray((earnings - pd.Timestamp(date.today())).days, dtype=float)
+
+    hot_mask = (pain >= _HOT["min_pain"]) & (age <= _HOT["max_hours"])
+    warm_mask = (pain >= _WARM["min_pain"]) | (age <= _WARM["max_hours"])
+    earnings_boost = (
+        warm_mask & ~hot_mask
+        & (days_to_earnings >= 0)
+        & (days_to_earnings <= _EARNINGS_URGENCY_DAYS)
+    )
+
+    return list(np.select([hot_mask | earnings_boost, warm_mask], ["hot", "warm"], default="cold"))
+
+
 def format_price_change(change: float) -> str:
     """Format price change with icon and color."""
     if change is None:
@@ -165,54 +261,109 @@ def format_market_cap_tier(tier: str) -> str:
     return "N/A"
 
 
-# Main area - Company Pain Dashboard
-st.header("🎯 Outreach Priorities")
+def _build_export_csv(company_summaries: list, fin_rows: list,
+                      urgencies: list, talking_points: list) -> bytes:
+    """Assemble the export table column-wise and serialize it to CSV bytes.
 
-# Filters row
-col1, col2, col3, col4 = st.columns([1, 1, 1, 2])
-with col1:
-    time_window = st.selectbox(
-        "Time Window",
-        options=config.TIME_WINDOW_OPTIONS,
-        index=config.TIME_WINDOW_OPTIONS.index(config.DEFAULT_TIME_WINDOW),
-        format_func=lambda x: f"Last {x} days"
+    Only invoked when the user actually clicks the download button, so no
+    DataFrame is materialized on ordinary reruns.
+    """
+    summary_df = pd.DataFrame(company_summaries)
+    fin_df = pd.DataFrame(fin_rows).reindex(
+        columns=["price_change_7d", "market_cap_tier", "next_earnings"]
     )
-with col2:
-    hide_contacted = st.checkbox("Hide contacted", value=False)
-with col3:
-    hide_snoozed = st.checkbox("Hide snoozed", value=False)
-
-# Load company pain summary
-try:
-    company_summaries = db.get_company_pain_summary(days=time_window)
-except Exception as e:
-    company_summaries = []
-    st.warning(f"Could not load data: {e}")
+    export_df = pd.DataFrame({
+        "Company": summary_df["name"],
+        "Ticker": summary_df["ticker"].fillna(""),
+        "Stock 7d": fin_df["price_change_7d"].map(
+            lambda x: f"{x:.1%}" if pd.notna(x) else "N/A"
+        ),
+        "Market Cap": fin_df["market_cap_tier"].fillna("unknown").map(format_market_cap_tier),
+        "Next Earnings": fin_df["next_earnings"].fillna("-"),
+        "Pain Score": summary_df["max_pain_score"].map("{:.0%}".format),
+        "Top Signal": summary_df["max_pain_summary"],
+        "Suggested Opener": pd.Series(talking_points, index=summary_df.index).fillna(""),
+        "Signal Count": summary_df["signal_count"],
+        "Urgency": [config.URGENCY_DISPLAY[u]["label"] for u in urgencies],
+    })
+    # Arrow-backed columns instead of object dtype - cheaper for Streamlit to
+    # hash in the cached CSV helper and to Arrow-serialize if ever displayed
+    try:
+        export_df = export_df.convert_dtypes(dtype_backend="pyarrow")
+    except (ImportError, TypeError):
+        pass  # pandas < 2.0 or pyarrow unavailable
+    return _to_csv(export_df)
+
+
+# Signal row templates - defined once so the render loop only pays for
+# field substitution, not template reconstruction
+_SIGNAL_ROW_TMPL = "{icon} **{signal_type}** ({pain:.0%}) \u2014 {summary}"
+_SIGNAL_SOURCE_LINK_TMPL = "<small>[{source}]({url}) \u2022 {published}</small>"
+_SIGNAL_SOURCE_TMPL = "<small>{source} \u2022 {published}</small>"
 
-# Get companies to hide based on filter settings
-companies_to_hide = set()
-if hide_contacted or hide_snoozed:
-    companies_to_hide = db.get_companies_to_hide(
-        contacted_days=config.CONTACTED_HIDE_DAYS if hide_contacted else 0,
-        snoozed_days=config.SNOOZE_DURATION_DAYS if hide_snoozed else 0,
-    )
 
-# Filter out hidden companies
-if companies_to_hide:
-    company_summaries = [c for c in company_summaries if c["company_id"] not in companies_to_hide]
+# Main area - Company Pain Dashboard
+st.header("🎯 Outreach Priorities")
 
-# Load financials for all companies
+# Filters row - inside a form so tweaking several filters triggers one
+# rerun (and one set of DB calls) on Apply, not one per widget change
+with st.form("filters"):
+    col1, col2, col3, col4 = st.columns([1, 1, 1, 2])
+    with col1:
+        time_window = st.selectbox(
+            "Time Window",
+            options=config.TIME_WINDOW_OPTIONS,
+            index=config.TIME_WINDOW_OPTIONS.index(config.DEFAULT_TIME_WINDOW),
+            format_func=lambda x: f"Last {x} days"
+        )
+    with col2:
+        hide_contacted = st.checkbox("Hide contacted", value=False)
+    with col3:
+        hide_snoozed = st.checkbox("Hide snoozed", value=False)
+    with col4:
+        st.form_submit_button("Apply")
+
+# Load the pain summary (with contacted/snoozed exclusions pushed into the
+# DB query) and financials together - the fetches overlap on a cache miss
 try:
-    financials_list = db.get_company_financials()
+    company_summaries, financials_list = _cached_dashboard_data(
+        time_window,
+        exclude_contacted_days=config.CONTACTED_HIDE_DAYS if hide_contacted else 0,
+        exclude_snoozed_days=config.SNOOZE_DURATION_DAYS if hide_snoozed else 0,
+    )
     financials_lookup = {f["company_id"]: f for f in financials_list}
-except Exception:
+except Exception as e:
+    company_summaries = []
     financials_lookup = {}
+    st.warning(f"Could not load data: {e}")
 
 if company_summaries:
-    # Prepare data for CSV export
-    export_rows = []
-
-    for company in company_summaries:
+    # Fetch outreach history for all companies in one query instead of
+    # two round trips per company inside the expander loop
+    try:
+        outreach_by_company = db.get_outreach_actions_bulk(
+            [c["company_id"] for c in company_summaries]
+        )
+    except Exception:
+        outreach_by_company = {}
+
+    # Precompute per-company derived values once, outside the render loop
+    fin_rows = [financials_lookup.get(c["company_id"], {}) for c in company_summaries]
+    urgencies = compute_urgencies_vectorized(
+        [c["max_pain_score"] for c in company_summaries],
+        [c["newest_signal_age_hours"] for c in company_summaries],
+        [f.get("next_earnings") for f in fin_rows],
+    )
+    talking_points = []
+    for c in company_summaries:
+        best_sig = max(
+            (s for s in c["signals"] if s.get("talking_point")),
+            key=lambda s: s.get("sales_relevance", 0),
+            default=None,
+        )
+        talking_points.append(best_sig["talking_point"] if best_sig else None)
+
+    for i, company in enumerate(company_summaries):
         name = company["name"]
         ticker = company.get("ticker")
         company_id = company["company_id"]
@@ -234,45 +385,26 @@ if company_summaries:
         cap_str = format_market_cap_tier(market_cap_tier)
         earnings_str = next_earnings if next_earnings else "-"
 
-        # Compute enhanced urgency (considers earnings proximity)
-        urgency = compute_enhanced_urgency(pain_score, age_hours, next_earnings)
+        # Urgency and talking point were precomputed above the loop
+        urgency = urgencies[i]
         urgency_display = config.URGENCY_DISPLAY[urgency]
-
-        # Find top talking point from highest pain signal
-        top_talking_point = None
-        for sig in sorted(signals, key=lambda s: s.get("sales_relevance", 0), reverse=True):
-            if sig.get("talking_point"):
-                top_talking_point = sig["talking_point"]
-                break
-
-        # Add to export
-        export_rows.append({
-            "Company": name,
-            "Ticker": ticker or "",
-            "Stock 7d": f"{price_change_7d:.1%}" if price_change_7d is not None else "N/A",
-            "Market Cap": cap_str,
-            "Next Earnings": earnings_str,
-            "Pain Score": f"{pain_score:.0%}",
-            "Top Signal": pain_summary,
-            "Suggested Opener": top_talking_point or "",
-            "Signal Count": signal_count,
-            "Urgency": urgency_display["label"],
-        })
+        top_talking_point = talking_points[i]
 
         # Create expander for each company
         urgency_icon = urgency_display["icon"]
 
         # Build expander header with financial info
-        header_parts = [
-            f"{urgency_icon} **{display_name}**",
-            f"{stock_str}" if ticker else "",
-            f"{cap_str}" if market_cap_tier != "unknown" else "",
-            f"Earnings: {earnings_str}" if next_earnings else "",
-            f"{pain_score:.0%} pain",
-            f"{signal_count} signals",
-            urgency_display['label'],
-        ]
-        header = " | ".join(p for p in header_parts if p)
+        header_parts = [f"{urgency_icon} **{display_name}**"]
+        if ticker:
+            header_parts.append(stock_str)
+        if market_cap_tier != "unknown":
+            header_parts.append(cap_str)
+        if next_earnings:
+            header_parts.append(f"Earnings: {earnings_str}")
+        header_parts.append(f"{pain_score:.0%} pain")
+        header_parts.append(f"{signal_count} signals")
+        header_parts.append(urgency_display['label'])
+        header = " | ".join(header_parts)
 
         with st.expander(header):
             # Financial summary row
@@ -295,25 +427,29 @@ if company_summaries:
             st.markdown(f"**Top pain signal:** {pain_summary}")
             st.divider()
 
-            # Show all signals
+            # Show all signals - build one markdown block so each expander
+            # issues a single component call instead of two per signal
+            signal_lines = []
             for signal in signals:
                 signal_type = signal.get("signal_type", "neutral")
-                icon = config.SIGNAL_ICONS.get(signal_type, "📰")
-                signal_pain = signal.get("sales_relevance", 0.5)
-                summary = signal.get("summary", "")
                 article = signal.get("articles", {})
-                source = article.get("source", "Unknown")
                 url = article.get("url", "")
-                published = article.get("published_at", "")[:10] if article.get("published_at") else ""
-
-                # Signal row
-                st.markdown(
-                    f"{icon} **{signal_type}** ({signal_pain:.0%}) — {summary}"
-                )
+                row = {
+                    "icon": config.SIGNAL_ICONS.get(signal_type, "📰"),
+                    "signal_type": signal_type,
+                    "pain": signal.get("sales_relevance", 0.5),
+                    "summary": signal.get("summary", ""),
+                    "source": article.get("source", "Unknown"),
+                    "url": url,
+                    "published": (article.get("published_at") or "")[:10],
+                }
+                signal_lines.append(_SIGNAL_ROW_TMPL.format_map(row))
                 if url:
-                    st.caption(f"[{source}]({url}) • {published}")
+                    signal_lines.append(_SIGNAL_SOURCE_LINK_TMPL.format_map(row))
                 else:
-                    st.caption(f"{source} • {published}")
+                    signal_lines.append(_SIGNAL_SOURCE_TMPL.format_map(row))
+
+            st.markdown("\n\n".join(signal_lines), unsafe_allow_html=True)
 
             # Outreach actions section
             st.divider()
@@ -322,11 +458,13 @@ if company_summaries:
             with btn_col1:
                 if st.button("✅ Contacted", key=f"contact_{company_id}"):
                     db.add_outreach_action(company_id, "contacted")
+                    _clear_data_caches()
                     st.rerun()
 
             with btn_col2:
                 if st.button("😴 Snooze", key=f"snooze_{company_id}"):
                     db.add_outreach_action(company_id, "snoozed")
+                    _clear_data_caches()
                     st.rerun()
 
             with btn_col3:
@@ -338,26 +476,28 @@ if company_summaries:
                 )
                 if st.button("📝 Add", key=f"note_{company_id}") and note_input:
                     db.add_outreach_action(company_id, "note", note_input)
+                    _clear_data_caches()
                     st.rerun()
 
-            # Show outreach history
-            last_contact = db.get_last_contact(company_id)
+            # Show outreach history (from the bulk query above)
+            actions = outreach_by_company.get(company_id, [])
+            last_contact = next(
+                (a for a in actions if a["action_type"] == "contacted"), None
+            )
             if last_contact:
                 st.caption(f"✅ Last contacted: {last_contact['created_at'][:10]}")
 
-            actions = db.get_outreach_actions(company_id)
             notes = [a for a in actions if a["action_type"] == "note" and a.get("note")]
             if notes:
                 for n in notes[:3]:
                     st.caption(f"📝 {n['note']} ({n['created_at'][:10]})")
 
-    # Export button
+    # Export button - data is a callable, so the CSV is only assembled
+    # when the user clicks download (cached across repeat downloads)
     st.divider()
-    df = pd.DataFrame(export_rows)
-    csv = df.to_csv(index=False)
     st.download_button(
         label="📥 Export Company Summary to CSV",
-        data=csv,
+        data=lambda: _build_export_csv(company_summaries, fin_rows, urgencies, talking_points),
         file_name="company_outreach_priorities.csv",
         mime="text/csv",
     )
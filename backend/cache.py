@@ -0,0 +1,58 @@
+# backend/cache.py - Cache-aside layer for hot read endpoints
+# In-process TTL cache with per-profile version counters. Write endpoints bump
+# a profile's version, which changes the cache keys built from it, so
+# invalidation is O(1) and needs no key scanning. The single-instance Render
+# deployment makes an external Redis unnecessary; the get_or_set interface is
+# shaped so one could be swapped in later.
+
+import time
+from collections import defaultdict
+from threading import Lock
+
+_store = {}
+_versions = defaultdict(int)
+_lock = Lock()
+
+# Version bucket for requests with no profile scope
+_GLOBAL = "__all__"
+
+
+def profile_version(profile_id: str = None) -> int:
+    """Current version counter for a profile (embed this in cache keys)."""
+    with _lock:
+        return _versions[profile_id or _GLOBAL]
+
+
+def invalidate(profile_id: str = None):
+    """Invalidate cached reads after a write.
+
+    Bumps the profile's version counter so keys built from it miss. Writes
+    without a profile scope (e.g. a global pipeline run) bump every counter.
+    """
+    with _lock:
+        if profile_id:
+            _versions[profile_id] += 1
+            _versions[_GLOBAL] += 1
+        else:
+            for key in list(_versions):
+                _versions[key] += 1
+            _versions[_GLOBAL] += 1
+
+
+async def get_or_set(key: str, ttl: float, loader):
+    """Return the cached value for key, or await loader() and cache the result."""
+    now = time.monotonic()
+    with _lock:
+        entry = _store.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+
+    value = await loader()
+
+    with _lock:
+        _store[key] = (now + ttl, value)
+        # Opportunistically evict expired entries so the store stays bounded
+        if len(_store) > 256:
+            for stale in [k for k, (exp, _) in _store.items() if exp <= now]:
+                del _store[stale]
+    return value
@@ -0,0 +1,69 @@
+# backend/jobs.py - In-process background jobs for long-running pipeline work
+# A full ETL run can take minutes at scale, which is longer than Render's
+# proxy timeout and ties up an API worker for the duration. Endpoints start
+# the work as an asyncio task and return immediately; the frontend polls the
+# job until it finishes. Single-instance deployment means an external queue
+# (Redis + rq/arq) would add cost and ops for no benefit here.
+
+import asyncio
+import time
+import uuid
+
+_jobs = {}
+_tasks = {}
+
+# Keep at most this many finished jobs around for late polls
+_MAX_FINISHED = 50
+
+
+def start(name: str, coro) -> dict:
+    """Start coro as a background task and return the new job record."""
+    job_id = uuid.uuid4().hex
+    record = {
+        "job_id": job_id,
+        "name": name,
+        "status": "running",
+        "result": None,
+        "error": None,
+        "started_at": time.time(),
+        "finished_at": None,
+    }
+    _jobs[job_id] = record
+    _tasks[job_id] = asyncio.create_task(_run(record, coro))
+    return record
+
+
+async def _run(record, coro):
+    try:
+        record["result"] = await coro
+        record["status"] = "done"
+    except Exception as e:
+        record["error"] = str(e)
+        record["status"] = "failed"
+    finally:
+        record["finished_at"] = time.time()
+        _tasks.pop(record["job_id"], None)
+        _evict_finished()
+
+
+def get(job_id: str) -> dict:
+    """Return the job record, or None if unknown (or already evicted)."""
+    return _jobs.get(job_id)
+
+
+def running(name: str) -> dict:
+    """Return the running job with this name, if any."""
+    for record in _jobs.values():
+        if record["name"] == name and record["status"] == "running":
+            return record
+    return None
+
+
+def _evict_finished():
+    """Drop the oldest finished jobs so the registry stays bounded."""
+    finished = [r for r in _jobs.values() if r["status"] != "running"]
+    if len(finished) <= _MAX_FINISHED:
+        return
+    finished.sort(key=lambda r: r["finished_at"])
+    for record in finished[: len(finished) - _MAX_FINISHED]:
+        del _jobs[record["job_id"]]
@@ -8,85 +8,146 @@ import os
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, parent_dir)
 
+import functools
+
+
 # Load secrets from .streamlit/secrets.toml for local development
 # (In production, use environment variables directly)
+@functools.cache
 def load_streamlit_secrets():
+    """Parse the secrets file once per process; repeat calls are no-ops."""
     secrets_path = os.path.join(parent_dir, ".streamlit", "secrets.toml")
-    if os.path.exists(secrets_path):
-        try:
-            import tomllib
-        except ImportError:
-            import tomli as tomllib
-        with open(secrets_path, "rb") as f:
-            secrets = tomllib.load(f)
-        for key, value in secrets.items():
-            if key not in os.environ:
-                os.environ[key] = str(value)
+    if not os.path.exists(secrets_path):
+        return {}
+    try:
+        import tomllib
+    except ImportError:
+        import tomli as tomllib
+    with open(secrets_path, "rb") as f:
+        secrets = tomllib.load(f)
+    for key, value in secrets.items():
+        if key not in os.environ:
+            os.environ[key] = str(value)
+    return secrets
 
 load_streamlit_secrets()
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+import orjson
+from pydantic.dataclasses import dataclass
 from typing import Optional
 
 import db
 import etl
 import config
+import cache
+import jobs
+
 
-app = FastAPI(title="Sales Intelligence Tracker API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build shared connections once at startup instead of on first request.
 
-# CORS for frontend
+    The Supabase client (and its underlying HTTP session) is created here so
+    no request pays the TCP/TLS handshake; db.py reuses the same singleton.
+    """
+    try:
+        app.state.db_client = await asyncio.to_thread(db.get_client)
+    except ValueError:
+        app.state.db_client = None  # Secrets not configured; first DB call will raise
+    yield
+
+
+app = FastAPI(
+    title="Sales Intelligence Tracker API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+
+# CORS for frontend - explicit origin/method/header lists keep the per-request
+# middleware check to a string compare, and max_age lets browsers cache the
+# preflight response for a day instead of sending OPTIONS per endpoint
+_frontend_url = os.environ.get("FRONTEND_URL")
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, set to specific frontend URL
+    allow_origins=[_frontend_url] if _frontend_url else ["*"],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=["content-type"],
+    max_age=86400,
 )
 
+# Compress large JSON responses (signals, init payloads) - repetitive key
+# names compress 5-10x. minimum_size skips small bodies where the gzip
+# header would cost more than it saves; level 5 trades a little ratio for
+# much less CPU than the default 9.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 
-# --- Pydantic Models ---
+# Outreach action types frozen once at import - O(1) membership checks and a
+# prebuilt error message instead of rebuilding the key list per bad request
+_ACTION_TYPES = frozenset(config.OUTREACH_ACTION_TYPES)
+_ACTION_TYPES_ERROR = (
+    f"Invalid action_type. Must be one of: {list(config.OUTREACH_ACTION_TYPES.keys())}"
+)
 
-class CompanyCreate(BaseModel):
+
+# --- Request Body Models ---
+# Pydantic dataclasses instead of BaseModel: same validation and OpenAPI
+# schema, but plain attribute storage (no model machinery per instance),
+# which is cheaper to construct on every request.
+
+@dataclass(slots=True)
+class CompanyCreate:
     name: str
     ticker: Optional[str] = None
     aliases: Optional[list[str]] = None
     profile_id: Optional[str] = None
 
 
-class OutreachCreate(BaseModel):
+@dataclass(slots=True)
+class OutreachCreate:
     company_id: str
     action_type: str
     note: Optional[str] = None
     profile_id: Optional[str] = None
 
 
-class ProfileCreate(BaseModel):
+@dataclass(slots=True)
+class ProfileCreate:
     name: str
 
 
 # --- Profile Endpoints ---
 
 @app.get("/api/profiles")
-def get_profiles():
+async def get_profiles():
     """Get all profiles."""
-    return db.get_profiles()
+    return await asyncio.to_thread(db.get_profiles)
 
 
 @app.post("/api/profiles")
-def create_profile(profile: ProfileCreate):
+async def create_profile(profile: ProfileCreate):
     """Create a new profile."""
     try:
-        return db.create_profile(name=profile.name)
+        return await asyncio.to_thread(db.create_profile, profile.name)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.delete("/api/profiles/{profile_id}")
-def delete_profile(profile_id: str):
+async def delete_profile(profile_id: str):
     """Delete a profile and its junction links."""
-    result = db.delete_profile(profile_id)
+    result = await asyncio.to_thread(db.delete_profile, profile_id)
     if not result:
         raise HTTPException(status_code=404, detail="Profile not found")
     return {"deleted": True, "profile_id": profile_id}
@@ -95,27 +156,29 @@ def delete_profile(profile_id: str):
 # --- Company Endpoints ---
 
 @app.get("/api/companies")
-def get_companies(active_only: bool = True, profile_id: Optional[str] = None):
+async def get_companies(active_only: bool = True, profile_id: Optional[str] = None):
     """Get all companies from watchlist."""
-    return db.get_companies(active_only=active_only, profile_id=profile_id)
+    return await asyncio.to_thread(db.get_companies, active_only, profile_id)
 
 
 @app.post("/api/companies")
-def add_company(company: CompanyCreate):
+async def add_company(company: CompanyCreate):
     """Add a company to the watchlist and fetch initial financials."""
     try:
-        result = db.add_company(
-            name=company.name,
-            ticker=company.ticker,
-            aliases=company.aliases,
-            profile_id=company.profile_id,
+        result = await asyncio.to_thread(
+            db.add_company,
+            company.name,
+            company.ticker,
+            company.aliases,
+            company.profile_id,
         )
+        cache.invalidate(company.profile_id)
 
         # Automatically fetch financials if ticker is provided
         if company.ticker:
             try:
-                financials = etl.fetch_company_financials(company.ticker)
-                db.upsert_company_financials(result["id"], financials)
+                financials = await asyncio.to_thread(etl.fetch_company_financials, company.ticker)
+                await asyncio.to_thread(db.upsert_company_financials, result["id"], financials)
             except Exception:
                 # Don't fail the company add if financials fetch fails
                 pass
@@ -125,99 +188,139 @@ def add_company(company: CompanyCreate):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+# The two cached read endpoints store pre-encoded JSON bytes rather than
+# dicts: serialization happens once per TTL window in the loader, and cache
+# hits hand the bytes straight to Response with no re-walk of the payload.
+
 @app.get("/api/companies/summary")
-def get_company_summary(days: int = 7, profile_id: Optional[str] = None):
+async def get_company_summary(days: int = 7, profile_id: Optional[str] = None):
     """Get company pain summary for outreach prioritization."""
-    return db.get_company_pain_summary(days=days, profile_id=profile_id)
+    key = f"summary:v{cache.profile_version(profile_id)}:{profile_id}:{days}"
+
+    async def _load():
+        rows = await asyncio.to_thread(db.get_company_pain_summary, days, profile_id)
+        return orjson.dumps(rows)
+
+    body = await cache.get_or_set(key, ttl=120, loader=_load)
+    return Response(body, media_type="application/json")
 
 
 @app.get("/api/init")
-def get_init_data(days: int = 7, contacted_days: int = 7, snoozed_days: int = 7, profile_id: Optional[str] = None):
+async def get_init_data(days: int = 7, contacted_days: int = 7, snoozed_days: int = 7, profile_id: Optional[str] = None):
     """Combined initial load endpoint - returns all data needed for first render."""
-    summary = db.get_company_pain_summary(days=days, profile_id=profile_id)
-    financials = db.get_company_financials(profile_id=profile_id)
-    outreach = db.get_outreach_details(
-        contacted_days=contacted_days,
-        snoozed_days=snoozed_days,
-        profile_id=profile_id,
+    key = (
+        f"init:v{cache.profile_version(profile_id)}:{profile_id}:"
+        f"{days}:{contacted_days}:{snoozed_days}"
     )
-    return {
-        "summary": summary,
-        "financials": financials,
-        "outreach": {
-            "contacted": outreach["contacted"],
-            "snoozed": outreach["snoozed"],
-        },
-    }
+
+    async def _load():
+        # The three reads are independent, so overlap their round-trips;
+        # total latency becomes one RTT instead of three
+        summary, financials, outreach = await asyncio.gather(
+            asyncio.to_thread(db.get_company_pain_summary, days, profile_id),
+            asyncio.to_thread(db.get_company_financials, None, profile_id),
+            asyncio.to_thread(
+                db.get_outreach_details, contacted_days, snoozed_days, profile_id
+            ),
+        )
+        return orjson.dumps({
+            "summary": summary,
+            "financials": financials,
+            "outreach": {
+                "contacted": outreach["contacted"],
+                "snoozed": outreach["snoozed"],
+            },
+        })
+
+    body = await cache.get_or_set(key, ttl=120, loader=_load)
+    return Response(body, media_type="application/json")
 
 
 @app.delete("/api/companies/{company_id}")
-def delete_company(company_id: str, profile_id: Optional[str] = None):
+async def delete_company(company_id: str, profile_id: Optional[str] = None):
     """Delete a company and all related data."""
-    result = db.delete_company(company_id, profile_id=profile_id)
+    result = await asyncio.to_thread(db.delete_company, company_id, profile_id)
     if not result:
         raise HTTPException(status_code=404, detail="Company not found")
+    cache.invalidate(profile_id)
     return {"deleted": True, "company_id": company_id}
 
 
 # --- Financials Endpoints ---
 
 @app.get("/api/financials")
-def get_financials(company_id: Optional[str] = None, profile_id: Optional[str] = None):
+async def get_financials(company_id: Optional[str] = None, profile_id: Optional[str] = None):
     """Get financial data for companies."""
-    return db.get_company_financials(company_id=company_id, profile_id=profile_id)
+    return await asyncio.to_thread(db.get_company_financials, company_id, profile_id)
 
 
 # --- Signals Endpoints ---
 
+def _json_array_stream(rows):
+    """Yield a JSON array one orjson-encoded row at a time."""
+    yield b"["
+    for i, row in enumerate(rows):
+        if i:
+            yield b","
+        yield orjson.dumps(row)
+    yield b"]"
+
+
 @app.get("/api/signals")
-def get_signals(
+async def get_signals(
     company_id: Optional[str] = None,
     min_relevance: float = 0.5,
     signal_type: Optional[str] = None,
     limit: int = 100,
+    offset: int = 0,
+    days: Optional[int] = None,
 ):
-    """Get signals with optional filters."""
-    return db.get_signals(
-        company_id=company_id,
-        min_relevance=min_relevance,
-        signal_type=signal_type,
-        limit=limit,
+    """Get signals with optional filters and server-side pagination.
+
+    Rows are streamed as they are encoded, so the response never holds the
+    whole serialized array in memory and the first bytes go out immediately.
+    """
+    created_after = None
+    if days:
+        created_after = datetime.now(timezone.utc) - timedelta(days=days)
+    rows = await asyncio.to_thread(
+        db.get_signals, company_id, min_relevance, signal_type, limit, offset,
+        created_after,
     )
+    return StreamingResponse(_json_array_stream(rows), media_type="application/json")
 
 
 @app.get("/api/signals/hot")
-def get_hot_signals(limit: int = 5):
+async def get_hot_signals(limit: int = 5):
     """Get top signals by sales relevance."""
-    return db.get_hot_signals(limit=limit)
+    return await asyncio.to_thread(db.get_hot_signals, limit)
 
 
 # --- Outreach Endpoints ---
 
 @app.post("/api/outreach")
-def add_outreach(outreach: OutreachCreate):
+async def add_outreach(outreach: OutreachCreate):
     """Log an outreach action for a company."""
-    if outreach.action_type not in config.OUTREACH_ACTION_TYPES:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid action_type. Must be one of: {list(config.OUTREACH_ACTION_TYPES.keys())}",
-        )
-    return db.add_outreach_action(
-        company_id=outreach.company_id,
-        action_type=outreach.action_type,
-        note=outreach.note,
-        profile_id=outreach.profile_id,
+    if outreach.action_type not in _ACTION_TYPES:
+        raise HTTPException(status_code=400, detail=_ACTION_TYPES_ERROR)
+    result = await asyncio.to_thread(
+        db.add_outreach_action,
+        outreach.company_id,
+        outreach.action_type,
+        outreach.note,
+        outreach.profile_id,
     )
+    cache.invalidate(outreach.profile_id)
+    return result
 
 
-# NOTE: /hidden must come BEFORE /{company_id} to avoid route conflict
-@app.get("/api/outreach/hidden")
-def get_hidden_companies(contacted_days: int = 7, snoozed_days: int = 7, profile_id: Optional[str] = None):
+# Static path distinct from /api/outreach/{company_id} so matching never
+# depends on route registration order
+@app.get("/api/outreach-hidden")
+async def get_hidden_companies(contacted_days: int = 7, snoozed_days: int = 7, profile_id: Optional[str] = None):
     """Get detailed info for hidden companies (recently contacted or snoozed)."""
-    result = db.get_outreach_details(
-        contacted_days=contacted_days,
-        snoozed_days=snoozed_days,
-        profile_id=profile_id,
+    result = await asyncio.to_thread(
+        db.get_outreach_details, contacted_days, snoozed_days, profile_id
     )
     return {
         "contacted": result["contacted"],
@@ -226,84 +329,163 @@ def get_hidden_companies(contacted_days: int = 7, snoozed_days: int = 7, profile
 
 
 @app.delete("/api/outreach/{company_id}/{action_type}")
-def delete_outreach_action(company_id: str, action_type: str, profile_id: Optional[str] = None):
+async def delete_outreach_action(company_id: str, action_type: str, profile_id: Optional[str] = None):
     """Delete the most recent outreach action of given type for a company."""
-    if action_type not in config.OUTREACH_ACTION_TYPES:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid action_type. Must be one of: {list(config.OUTREACH_ACTION_TYPES.keys())}",
-        )
-    deleted = db.delete_outreach_action(company_id, action_type, profile_id=profile_id)
+    if action_type not in _ACTION_TYPES:
+        raise HTTPException(status_code=400, detail=_ACTION_TYPES_ERROR)
+    deleted = await asyncio.to_thread(db.delete_outreach_action, company_id, action_type, profile_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="No action found to delete")
+    cache.invalidate(profile_id)
     return {"deleted": True, "company_id": company_id, "action_type": action_type}
 
 
 @app.get("/api/outreach/{company_id}")
-def get_outreach_actions(company_id: str, limit: int = 10):
+async def get_outreach_actions(company_id: str, limit: int = 10):
     """Get recent outreach actions for a company."""
-    return db.get_outreach_actions(company_id=company_id, limit=limit)
+    return await asyncio.to_thread(db.get_outreach_actions, company_id, limit)
 
 
 # --- Pipeline Endpoints ---
+# Pipeline runs can outlast the proxy timeout, so these endpoints start a
+# background job and return 202 with a job_id; the frontend polls
+# /api/pipeline/jobs/{job_id} until the job finishes.
+#
+# Job names include the profile scope, so a second POST while a run is in
+# flight coalesces onto the existing job instead of starting a duplicate
+# ETL run (which would double the Claude/yfinance spend for no new data).
+
+@app.post("/api/pipeline/run", status_code=202)
+async def run_pipeline(profile_id: Optional[str] = None):
+    """Start the full ETL pipeline for active companies (returns a job)."""
+    name = f"pipeline:{profile_id}"
+    in_flight = jobs.running(name)
+    if in_flight:
+        return in_flight
+
+    async def work():
+        result = await asyncio.to_thread(etl.run_pipeline, profile_id)
+        cache.invalidate(profile_id)
+        return result
 
-@app.post("/api/pipeline/run")
-def run_pipeline(profile_id: Optional[str] = None):
-    """Run the full ETL pipeline for active companies."""
-    result = etl.run_pipeline(profile_id=profile_id)
-    return result
+    return jobs.start(name, work())
 
 
-@app.post("/api/pipeline/financials")
-def refresh_financials(profile_id: Optional[str] = None):
-    """Refresh financial data for companies with stale data."""
-    result = etl.refresh_financials(profile_id=profile_id)
-    return result
+@app.post("/api/pipeline/financials", status_code=202)
+async def refresh_financials(profile_id: Optional[str] = None):
+    """Start a financials refresh for companies with stale data (returns a job)."""
+    name = f"financials:{profile_id}"
+    in_flight = jobs.running(name)
+    if in_flight:
+        return in_flight
 
+    async def work():
+        result = await asyncio.to_thread(etl.refresh_financials, False, profile_id)
+        cache.invalidate(profile_id)
+        return result
+
+    return jobs.start(name, work())
+
+
+@app.post("/api/pipeline/update-all", status_code=202)
+async def update_all(profile_id: Optional[str] = None):
+    """Start a full pipeline run plus financials refresh (returns a job)."""
+    name = f"update-all:{profile_id}"
+    in_flight = jobs.running(name)
+    if in_flight:
+        return in_flight
+
+    async def work():
+        # The news pipeline and the yfinance refresh touch different tables
+        # and are both network-bound, so run them concurrently
+        pipeline_result, financials_result = await asyncio.gather(
+            asyncio.to_thread(etl.run_pipeline, profile_id),
+            asyncio.to_thread(etl.refresh_financials, True, profile_id),
+        )
+        cache.invalidate(profile_id)
+        return {
+            "pipeline": pipeline_result,
+            "financials": financials_result,
+        }
+
+    return jobs.start(name, work())
 
-@app.post("/api/pipeline/update-all")
-def update_all(profile_id: Optional[str] = None):
-    """Run full pipeline and refresh financials in one call."""
-    pipeline_result = etl.run_pipeline(profile_id=profile_id)
-    financials_result = etl.refresh_financials(force=True, profile_id=profile_id)
-    return {
-        "pipeline": pipeline_result,
-        "financials": financials_result,
-    }
+
+@app.get("/api/pipeline/jobs/{job_id}")
+async def get_pipeline_job(job_id: str):
+    """Get the status (and result, once finished) of a pipeline job."""
+    record = jobs.get(job_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return record
 
 
 @app.delete("/api/pipeline/clear")
-def clear_data():
+async def clear_data():
     """Clear all signals and articles (use with caution)."""
-    result = db.clear_signals_and_articles()
+    result = await asyncio.to_thread(db.clear_signals_and_articles)
+    cache.invalidate()
     return result
 
 
 # --- Config Endpoints ---
+# These return constants, so the JSON bytes and ETags are precomputed at
+# import and repeat requests short-circuit to 304 via If-None-Match.
+
+import hashlib
+
+_SIGNAL_TYPES_BYTES = orjson.dumps(config.SIGNAL_TYPES)
+_SIGNAL_TYPES_ETAG = f'"{hashlib.sha256(_SIGNAL_TYPES_BYTES).hexdigest()}"'
+_URGENCY_BYTES = orjson.dumps({
+    "thresholds": config.URGENCY_THRESHOLDS,
+    "display": config.URGENCY_DISPLAY,
+})
+_URGENCY_ETAG = f'"{hashlib.sha256(_URGENCY_BYTES).hexdigest()}"'
+_HEALTH_BYTES = orjson.dumps({"status": "healthy", "version": "1.0.0"})
+_HEALTH_ETAG = f'"{hashlib.sha256(_HEALTH_BYTES).hexdigest()}"'
+
+
+def _cached_json(request: Request, body: bytes, etag: str, max_age: int = 3600) -> Response:
+    """Serve precomputed JSON with cache headers, honoring If-None-Match."""
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 @app.get("/api/config/signal-types")
-def get_signal_types():
+async def get_signal_types(request: Request):
     """Get available signal types with descriptions."""
-    return config.SIGNAL_TYPES
+    return _cached_json(request, _SIGNAL_TYPES_BYTES, _SIGNAL_TYPES_ETAG)
 
 
 @app.get("/api/config/urgency")
-def get_urgency_config():
+async def get_urgency_config(request: Request):
     """Get urgency thresholds and display settings."""
-    return {
-        "thresholds": config.URGENCY_THRESHOLDS,
-        "display": config.URGENCY_DISPLAY,
-    }
+    return _cached_json(request, _URGENCY_BYTES, _URGENCY_ETAG)
 
 
 # --- Health Check ---
 
 @app.get("/api/health")
-def health_check():
+async def health_check(request: Request):
     """Health check endpoint."""
-    return {"status": "healthy", "version": "1.0.0"}
+    return _cached_json(request, _HEALTH_BYTES, _HEALTH_ETAG, max_age=60)
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Explicit uvloop + httptools (C event loop / HTTP parser, bundled with
+    # uvicorn[standard]). Single worker by design: the pipeline job registry
+    # (jobs.py) and response cache (cache.py) are in-process, so a second
+    # worker would 404 job polls that land on the wrong process, break
+    # duplicate-run coalescing, and serve stale cached bytes after writes.
+    # Don't raise this without moving that state out of process first.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=1,
+    )
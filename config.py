@@ -1,5 +1,7 @@
 # config.py - Constants, settings, and prompts
-# No logic or side effects here
+# No logic or side effects here (derived constants are computed once at import)
+
+import re
 
 # Signal types for IR pain detection
 SIGNAL_TYPES = {
@@ -39,15 +41,24 @@ CLAUDE_TEMPERATURE = 0.1
 
 # Keywords that indicate non-IR news (HR, legal, operational matters)
 # Headlines matching these patterns are overridden to neutral regardless of model output
-NON_IR_KEYWORDS = [
+NON_IR_KEYWORDS = (
     "discrimination", "eeoc", "dei policy", "dei policies", "dei program",
     "workplace bias", "bias against", "labor dispute", "employee lawsuit",
     "workers' comp", "harassment", "wrongful termination", "nlrb",
     "union vote", "product recall", "food safety", "customer complaint",
-]
-
-# Classification prompt for IR pain detection
-SIGNAL_CLASSIFICATION_PROMPT = """<role>
+)
+
+# Compiled once at import so the per-headline override check is a single
+# regex scan instead of one substring search per keyword
+NON_IR_PATTERN = re.compile("|".join(map(re.escape, NON_IR_KEYWORDS)), re.IGNORECASE)
+
+# Classification prompt for IR pain detection.
+# Each prompt is split into a STATIC part (role, criteria, examples, scoring —
+# byte-identical across all companies, sent with cache_control so Anthropic's
+# prompt caching bills it at ~10% and skips prefill) and a DYNAMIC tail
+# (the <input_data> block, formatted per call). Keep every company-specific
+# reference out of the STATIC part or the cache entry changes per company.
+SIGNAL_CLASSIFICATION_PROMPT_STATIC = """<role>
 You are an Investor Relations signal analyst. Your job is to determine whether a news headline creates work for a company's IR team — the people who manage relationships with investors, analysts, and the capital markets.
 </role>
 
@@ -84,12 +95,6 @@ IMPORTANT: Do not confuse government employment investigations (EEOC, DOL, NLRB)
 When a headline falls outside IR relevance, classify as "neutral" with ir_pain_score 0.0.
 </ir_relevance_criteria>
 
-<input_data>
-Company: {company_name}
-Headline: {title}
-Source: {source}
-</input_data>
-
 <signal_types>
 - activist_risk: Ownership changes, 13-D filings, activist involvement
 - analyst_negative: Downgrades, price target cuts, coverage drops
@@ -107,17 +112,17 @@ Source: {source}
 Example 1 — IR-relevant, high pain:
 Headline: "Morgan Stanley downgrades Nike to Underweight, cuts PT to $65"
 Output:
-{{"summary": "Morgan Stanley downgraded Nike, cutting price target to $65. IR team faces investor inquiries and must prepare counter-narrative.", "signal_type": "analyst_negative", "relevance_score": 0.95, "ir_pain_score": 0.85}}
+{"summary": "Morgan Stanley downgraded Nike, cutting price target to $65. IR team faces investor inquiries and must prepare counter-narrative.", "signal_type": "analyst_negative", "relevance_score": 0.95, "ir_pain_score": 0.85}
 
 Example 2 — Not IR-relevant, neutral (government employment probe is HR, not governance):
 Headline: "EEOC alleges anti-white discrimination at Nike, seeks court enforcement of subpoena"
 Output:
-{{"summary": "EEOC employment discrimination probe — this is an HR/legal matter, not a governance or capital markets event.", "signal_type": "neutral", "relevance_score": 0.9, "ir_pain_score": 0.0}}
+{"summary": "EEOC employment discrimination probe — this is an HR/legal matter, not a governance or capital markets event.", "signal_type": "neutral", "relevance_score": 0.9, "ir_pain_score": 0.0}
 
 Example 3 — Borderline, moderate pain:
 Headline: "Nike CFO Matt Friend to step down effective April 2026"
 Output:
-{{"summary": "CFO departure creates IR workload: analyst calls, investor reassurance, and transition messaging.", "signal_type": "leadership_change", "relevance_score": 0.95, "ir_pain_score": 0.6}}
+{"summary": "CFO departure creates IR workload: analyst calls, investor reassurance, and transition messaging.", "signal_type": "leadership_change", "relevance_score": 0.95, "ir_pain_score": 0.6}
 </examples>
 
 <scoring_guide>
@@ -127,44 +132,52 @@ ir_pain_score reflects how much new work this creates for the IR team:
 - 0.2-0.4: Minor — routine negative coverage, peer outperformance
 - 0.0: No IR work — internal HR matters, product issues, marketing news, operational updates
 
-If the headline is not actually about {company_name}, set relevance_score below 0.3.
+If the headline is not actually about the company named in <input_data>, set relevance_score below 0.3.
 </scoring_guide>
 
 Before responding, ask: "Would the IR team need to brief investors or analysts about this?" If no, set signal_type to "neutral" and ir_pain_score to 0.0. Employment disputes, EEOC probes, and DEI investigations are handled by HR and legal — the IR team does not brief investors on these.
 
 Respond with ONLY this JSON (no other text):
-{{
+{
     "summary": "1-2 sentence summary focused on IR impact",
     "signal_type": "one of the signal types above",
     "relevance_score": 0.0-1.0,
     "ir_pain_score": 0.0-1.0
-}}"""
+}"""
+
+SIGNAL_CLASSIFICATION_PROMPT_DYNAMIC = """<input_data>
+Company: {company_name}
+Headline: {title}
+Source: {source}
+</input_data>"""
 
 # Talking points prompt for outreach openers (one per company, based on top signals)
-TALKING_POINTS_PROMPT = """<role>
+TALKING_POINTS_PROMPT_STATIC = """<role>
 You are a senior IR services consultant drafting an outreach opener for a salesperson.
 </role>
 
 <task>
-Write a single 1-2 sentence outreach opener for {company_name} based on their most pressing IR situation. Pick the single most compelling pain point from the signals below and reference it specifically.
+Write a single 1-2 sentence outreach opener for the company in <input_data> based on their most pressing IR situation. Pick the single most compelling pain point from the signals and reference it specifically.
 </task>
 
-<signals>
-{signals_block}
-</signals>
-
 <style>
 Write as a busy professional sending a quick note between meetings. Reference a specific IR-facing situation (stock impact, analyst sentiment, governance concern, leadership transition) rather than general company news. Keep it empathetic and low-pressure.
 </style>
 
 Return ONLY the talking point text, no quotes or labels."""
 
+TALKING_POINTS_PROMPT_DYNAMIC = """<input_data>
+Company: {company_name}
+Signals:
+{signals_block}
+</input_data>"""
+
 # Talking points settings
 TALKING_POINTS_MIN_PAIN = 0.5  # Only generate for signals with pain >= this threshold
 
-# Batch classification prompt (combines classification + talking point)
-BATCH_CLASSIFICATION_PROMPT = """<role>
-You are an Investor Relations signal analyst. Determine whether each headline creates work for {company_name}'s IR team — the people who manage relationships with investors, analysts, and the capital markets.
+# Batch classification prompt (classification only; talking points generated separately)
+BATCH_CLASSIFICATION_PROMPT_STATIC = """<role>
+You are an Investor Relations signal analyst. Determine whether each headline creates work for the company's IR team — the people who manage relationships with investors, analysts, and the capital markets.
 </role>
 
 <first_check>
@@ -196,12 +209,6 @@ Classify as "neutral" with ir_pain_score 0.0 when news does not create IR work:
 IMPORTANT: Do not confuse government employment investigations (EEOC, DOL, NLRB) with SEC or financial regulatory actions. An EEOC discrimination probe is an HR matter, not a governance issue. Only SEC enforcement, shareholder lawsuits, or proxy contests qualify as governance_issue.
 </ir_relevance_criteria>
 
-<input_data>
-Company: {company_name}
-Headlines to analyze:
-{headlines_block}
-</input_data>
-
 <signal_types>
 activist_risk | analyst_negative | earnings_miss | leadership_change | governance_issue | esg_negative | stock_pressure | capital_stress | peer_pressure | neutral
 </signal_types>
@@ -220,31 +227,42 @@ Headline: "Goldman Sachs downgrades Company to Sell, cuts PT 20%"
 0.2-0.4: Minor — routine negative coverage, peer outperformance
 0.0: No IR work — internal HR, product issues, marketing, operational updates
 
-If a headline is not actually about {company_name}, set relevance_score below 0.3.
+If a headline is not actually about the company named in <input_data>, set relevance_score below 0.3.
 </scoring>
 
 Before responding, ask for each headline: "Would the IR team need to brief investors or analysts about this?" If no, set signal_type to "neutral" and ir_pain_score to 0.0. Employment disputes, EEOC probes, and DEI investigations are handled by HR and legal — the IR team does not brief investors on these.
 
 Respond with ONLY this JSON:
-{{
+{
   "results": [
-    {{
+    {
       "headline_index": 0,
       "summary": "1-2 sentence summary focused on IR impact",
       "signal_type": "type from above",
       "relevance_score": 0.0-1.0,
       "ir_pain_score": 0.0-1.0
-    }}
+    }
   ]
-}}
+}
 """
 
+BATCH_CLASSIFICATION_PROMPT_DYNAMIC = """<input_data>
+Company: {company_name}
+Headlines to analyze:
+{headlines_block}
+</input_data>"""
+
 # Earnings urgency settings
 EARNINGS_URGENCY_DAYS = 14  # Boost urgency if earnings within this window
 
 # Pipeline settings
 MAX_ARTICLES_PER_COMPANY = 10  # Limit RSS results to reduce API calls
-BATCH_CLASSIFICATION_SIZE = 8  # Articles per Claude API call
+# Articles per Claude API call. Sized above MAX_ARTICLES_PER_COMPANY so a
+# full per-company fetch fits in one call (8 used to split 10 into 8+2),
+# and the cached static prompt prefix amortizes over more headlines.
+# Output budget: BATCH_CLASSIFICATION_SIZE * CLAUDE_MAX_TOKENS must stay
+# within the model's max output tokens (8192 for Haiku).
+BATCH_CLASSIFICATION_SIZE = 16
 COMPANY_PARALLELISM = 5  # Concurrent company processing
 
 # Dashboard settings
@@ -1,24 +1,70 @@
 # db.py - Database operations (CRUD, queries)
 # No external API calls or UI code here
 
+import functools
+import logging
 import os
+import threading
 from datetime import datetime, timezone, timedelta
 from supabase import create_client, Client
 
 import config
 
+logger = logging.getLogger(__name__)
+
 # Initialize Supabase client (singleton)
 _client: Client = None
+_client_lock = threading.Lock()
+
+def _tune_postgrest_session(client: Client):
+    """Swap the PostgREST httpx session for one with explicit pool settings.
+
+    httpx's default keepalive_expiry is 5 seconds, so the gaps between
+    dashboard interactions are enough to drop the connection and pay a fresh
+    TCP+TLS handshake to Supabase on the next query. A 60s expiry keeps the
+    connection warm across a browsing session, and the bounded pool keeps a
+    burst of concurrent sessions from exhausting Supabase's connection cap.
+    Explicit timeouts make a hung connect fail in seconds instead of hanging
+    a worker on the library default. Best-effort: if the library's internals
+    change, keep the stock session.
+    """
+    try:
+        import httpx
+        old = client.postgrest.session
+        client.postgrest.session = httpx.Client(
+            base_url=old.base_url,
+            headers=old.headers,
+            timeout=httpx.Timeout(connect=5.0, read=30.0, write=30.0, pool=10.0),
+            limits=httpx.Limits(
+                max_connections=20,
+                max_keepalive_connections=20,
+                keepalive_expiry=60,
+            ),
+        )
+        old.close()
+    except Exception:
+        pass
+
 
 def get_client() -> Client:
-    """Get cached Supabase client from environment/secrets."""
+    """Get cached Supabase client from environment/secrets.
+
+    Double-checked init: the pipeline's COMPANY_PARALLELISM workers can race
+    to first use, and without the lock each racer would build its own client
+    and connection pool. The no-lock fast path keeps the per-call cost of the
+    singleton at one attribute read.
+    """
     global _client
     if _client is None:
-        url = os.environ.get("SUPABASE_URL")
-        key = os.environ.get("SUPABASE_KEY")
-        if not url or not key:
-            raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set")
-        _client = create_client(url, key)
+        with _client_lock:
+            if _client is None:
+                url = os.environ.get("SUPABASE_URL")
+                key = os.environ.get("SUPABASE_KEY")
+                if not url or not key:
+                    raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set")
+                client = create_client(url, key)
+                _tune_postgrest_session(client)
+                _client = client
     return _client
 
 
@@ -39,7 +85,7 @@ def create_profile(name: str) -> dict:
 def get_profiles() -> list:
     """Get all profiles, ordered by name."""
     client = get_client()
-    result = client.table(config.TABLE_PROFILES).select("*").order("name").execute()
+    result = client.table(config.TABLE_PROFILES).select("id, name, created_at").order("name").execute()
     return result.data
 
 
@@ -94,34 +140,73 @@ def is_company_orphaned(company_id: str) -> bool:
     return len(result.data) == 0
 
 
+# PostgREST encodes in_() lists into the request query string, so a few
+# hundred UUIDs or URLs are enough to overflow proxy/server URL limits.
+# Chunk large lists and merge the results client-side.
+_IN_CHUNK_SIZE = 200
+
+def _in_chunks(values: list, size: int = _IN_CHUNK_SIZE):
+    """Yield successive slices of values for chunked in_() filters."""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _iso_ts(value: str) -> float:
+    """Parse a PostgREST ISO-8601 timestamp to epoch seconds.
+
+    datetime.fromisoformat is a C fast path; try it directly first since it
+    accepts a trailing 'Z' on Python 3.11+, and only pay the replace()
+    string allocation on older runtimes. Returning epoch floats lets row
+    loops compare ages without building timedelta objects per row.
+    """
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
 # --- Companies ---
 
+# Explicit column list for company reads - the UI renders all of these, and
+# an explicit list keeps future table columns from silently widening every
+# payload the way select("*") would
+_COMPANY_COLUMNS = "id, name, ticker, aliases, active, created_at"
+
 def add_company(name: str, ticker: str = None, aliases: list = None, profile_id: str = None) -> dict:
     """Add a company to the watchlist. If ticker exists and profile_id given, reuse existing company."""
     client = get_client()
 
-    # Check for existing ticker
-    if ticker:
-        existing = get_company_by_ticker(ticker)
-        if existing:
-            if profile_id:
-                # Reuse existing company — just create junction link
-                link_company_to_profile(profile_id, existing["id"])
-                return existing
-            else:
-                raise ValueError(f"Company with ticker '{ticker}' already exists")
-
     data = {
         "name": name,
         "ticker": ticker,
         "aliases": aliases or [name],
         "active": True,
     }
-    result = client.table(config.TABLE_COMPANIES).insert(data).execute()
-    company = result.data[0] if result.data else None
 
-    if company and profile_id:
-        link_company_to_profile(profile_id, company["id"])
+    if ticker:
+        # Single round trip: the upsert inserts or, on a ticker conflict,
+        # does nothing and returns no rows - the database arbitrates the
+        # duplicate atomically instead of a racy SELECT-then-INSERT
+        result = client.table(config.TABLE_COMPANIES).upsert(
+            data, on_conflict="ticker", ignore_duplicates=True
+        ).execute()
+        company = result.data[0] if result.data else None
+        if company is None:
+            # Ticker already exists - reuse for this profile or reject
+            existing = get_company_by_ticker(ticker)
+            if profile_id and existing:
+                link_company_to_profile(profile_id, existing["id"])
+                return existing
+            raise ValueError(f"Company with ticker '{ticker}' already exists")
+    else:
+        # No ticker means no conflict target (NULLs never collide)
+        result = client.table(config.TABLE_COMPANIES).insert(data).execute()
+        company = result.data[0] if result.data else None
+
+    if company:
+        _invalidate_company_caches()
+        if profile_id:
+            link_company_to_profile(profile_id, company["id"])
 
     return company
 
@@ -134,31 +219,65 @@ def get_companies(active_only: bool = True, profile_id: str = None) -> list:
         company_ids = get_profile_company_ids(profile_id)
         if not company_ids:
             return []
-        query = client.table(config.TABLE_COMPANIES).select("*").in_("id", company_ids)
-        if active_only:
-            query = query.eq("active", True)
-        result = query.execute()
-        return result.data
-
-    query = client.table(config.TABLE_COMPANIES).select("*")
+        rows = []
+        for chunk in _in_chunks(company_ids):
+            query = client.table(config.TABLE_COMPANIES).select(_COMPANY_COLUMNS).in_("id", chunk)
+            if active_only:
+                query = query.eq("active", True)
+            rows.extend(query.execute().data)
+        return rows
+
+    query = client.table(config.TABLE_COMPANIES).select(_COMPANY_COLUMNS)
     if active_only:
         query = query.eq("active", True)
     result = query.execute()
     return result.data
 
 
-def get_company_by_ticker(ticker: str) -> dict:
-    """Get a company by ticker symbol."""
+@functools.lru_cache(maxsize=1024)
+def _get_company_by_ticker_cached(ticker: str) -> dict:
     client = get_client()
-    result = client.table(config.TABLE_COMPANIES).select("*").eq("ticker", ticker).execute()
+    result = client.table(config.TABLE_COMPANIES).select(_COMPANY_COLUMNS).eq("ticker", ticker).execute()
     return result.data[0] if result.data else None
 
 
+def get_company_by_ticker(ticker: str) -> dict:
+    """Get a company by ticker symbol.
+
+    Ticker→row lookups are memoized (companies rarely change); writes that
+    can change the mapping clear the cache via _invalidate_company_caches.
+    """
+    return _get_company_by_ticker_cached(ticker)
+
+
+def _invalidate_company_caches():
+    """Drop memoized company lookups after a company insert/delete."""
+    _get_company_by_ticker_cached.cache_clear()
+
+
 def delete_company(company_id: str, profile_id: str = None) -> dict:
     """Delete a company. If profile_id, unlink from profile and only delete if orphaned."""
     client = get_client()
 
     if profile_id:
+        # Prefer the single-transaction function (see schema.sql): unlink,
+        # scoped outreach delete, and conditional orphan delete in one
+        # round-trip instead of three or four
+        try:
+            result = client.rpc("delete_company_scoped", {
+                "p_company_id": company_id,
+                "p_profile_id": profile_id,
+            }).execute()
+            _invalidate_company_caches()
+            # The company (and its signals, via cascade) may have been
+            # removed - drop them from the hot-signals top-N too
+            refresh_hot_signals()
+            return {"id": company_id} if result.data else None
+        except Exception:
+            # Function may not exist on older deployments - fall back to
+            # the stepwise path
+            pass
+
         # Unlink from this profile
         unlink_company_from_profile(profile_id, company_id)
         # Delete profile-scoped outreach for this company
@@ -170,29 +289,34 @@ def delete_company(company_id: str, profile_id: str = None) -> dict:
             return {"id": company_id}
         # Fall through to full delete if orphaned
 
-    # Full delete: remove related data then company
-    client.table(config.TABLE_SIGNALS).delete().eq("company_id", company_id).execute()
-    client.table(config.TABLE_ARTICLES).delete().eq("company_id", company_id).execute()
-    client.table(config.TABLE_FINANCIALS).delete().eq("company_id", company_id).execute()
-    client.table(config.TABLE_OUTREACH).delete().eq("company_id", company_id).execute()
-    client.table(config.TABLE_PROFILE_COMPANIES).delete().eq("company_id", company_id).execute()
-
+    # Full delete: one round trip - every child table (signals, articles,
+    # financials, outreach, profile links) declares ON DELETE CASCADE on its
+    # company_id FK, so Postgres removes related rows in the same transaction
     result = client.table(config.TABLE_COMPANIES).delete().eq("id", company_id).execute()
+    _invalidate_company_caches()
+    # Cascaded signal deletes must fall out of the hot-signals top-N as well
+    refresh_hot_signals()
     return result.data[0] if result.data else None
 
 
 # --- Articles ---
 
-def add_article(company_id: str, title: str, url: str, source: str, published_at: datetime) -> dict:
-    """Add an article. Returns None if URL already exists (dedup)."""
+def add_article(company_id: str, title: str, url: str, source: str, published_at: datetime, fetched_at: datetime = None) -> dict:
+    """Add an article. Returns None if URL already exists (dedup).
+
+    Callers looping this (e.g. the batch-insert fallback) can pass a shared
+    fetched_at so the timestamp is computed once per batch, not per row.
+    """
     client = get_client()
+    if fetched_at is None:
+        fetched_at = datetime.now(timezone.utc)
     data = {
         "company_id": company_id,
         "title": title,
         "url": url,
         "source": source,
         "published_at": published_at.isoformat() if published_at else None,
-        "fetched_at": datetime.now(timezone.utc).isoformat(),
+        "fetched_at": fetched_at.isoformat(),
     }
     try:
         result = client.table(config.TABLE_ARTICLES).insert(data).execute()
@@ -204,20 +328,57 @@ def add_article(company_id: str, title: str, url: str, source: str, published_at
         raise
 
 
+def add_articles_batch(articles: list) -> list:
+    """Insert multiple articles in a single database call.
+
+    Uses upsert with ignore_duplicates so rows whose URL already exists are
+    silently dropped by the database instead of raising per-row unique
+    violations. Returns only the newly inserted rows.
+
+    Args:
+        articles: List of dicts with keys: company_id, title, url, source,
+                  published_at and optionally fetched_at (filled in once for
+                  the whole batch when omitted)
+    """
+    if not articles:
+        return []
+    fetched_at = datetime.now(timezone.utc).isoformat()
+    for row in articles:
+        row.setdefault("fetched_at", fetched_at)
+    client = get_client()
+    result = client.table(config.TABLE_ARTICLES).upsert(
+        articles, on_conflict="url", ignore_duplicates=True
+    ).execute()
+    return result.data
+
+
 def article_exists(url: str) -> bool:
-    """Check if article URL already exists."""
+    """Check if article URL already exists.
+
+    HEAD + count=exact returns just the Content-Range count - no row body
+    is serialized on either side. Callers checking many URLs should use
+    get_existing_urls instead of looping this.
+    """
     client = get_client()
-    result = client.table(config.TABLE_ARTICLES).select("id").eq("url", url).execute()
-    return len(result.data) > 0
+    result = client.table(config.TABLE_ARTICLES).select(
+        "id", count="exact", head=True
+    ).eq("url", url).execute()
+    return (result.count or 0) > 0
 
 
+# PostgREST encodes in_() filters into the request URI, so very large URL
+# lists must be chunked to stay under proxy URI limits. Per-company fetches
+# (MAX_ARTICLES_PER_COMPANY) never split; this guards global dedup sweeps.
 def get_existing_urls(urls: list) -> set:
     """Batch check which URLs already exist. Returns set of existing URLs."""
     if not urls:
         return set()
     client = get_client()
-    result = client.table(config.TABLE_ARTICLES).select("url").in_("url", urls).execute()
-    return {row["url"] for row in result.data}
+    existing = set()
+    for chunk in _in_chunks(urls):
+        result = client.table(config.TABLE_ARTICLES).select("url").in_("url", chunk).execute()
+        existing.update(row["url"] for row in result.data)
+    return existing
 
 
 # --- Signals ---
@@ -259,18 +420,52 @@ def add_signals_batch(signals: list) -> list:
 def clear_signals_and_articles() -> dict:
     """Delete all signals and articles. Returns counts of deleted rows."""
     client = get_client()
+
+    # Prefer the TRUNCATE function (see schema.sql): O(1) instead of a
+    # row-by-row DELETE, and the response is two counts instead of every
+    # deleted row echoed back over the wire
+    try:
+        result = client.rpc("clear_signals_and_articles").execute()
+        row = result.data[0] if result.data else {}
+        refresh_hot_signals()
+        return {
+            "signals": row.get("signals_deleted", 0),
+            "articles": row.get("articles_deleted", 0),
+        }
+    except Exception:
+        # Function may not exist on older deployments - fall back to the
+        # sentinel-filtered DELETE (PostgREST refuses an unfiltered one)
+        pass
+
     # Delete signals first (foreign key dependency)
     signals = client.table(config.TABLE_SIGNALS).delete().neq("id", "00000000-0000-0000-0000-000000000000").execute()
     articles = client.table(config.TABLE_ARTICLES).delete().neq("id", "00000000-0000-0000-0000-000000000000").execute()
+    refresh_hot_signals()
     return {"signals": len(signals.data), "articles": len(articles.data)}
 
 
-def get_signals(company_id: str = None, min_relevance: float = 0.5, signal_type: str = None, limit: int = 100) -> list:
-    """Get signals with optional filters."""
+# Column list for signal reads: everything the UI renders, nothing more.
+# Embedding full articles(*)/companies(*) rows roughly doubled the payload.
+_SIGNAL_COLUMNS = (
+    "id, article_id, company_id, summary, signal_type, relevance_score, "
+    "sales_relevance, talking_point, created_at, "
+    "articles(id, title, url, source, published_at), "
+    "companies(id, name, ticker)"
+)
+
+
+def get_signals(company_id: str = None, min_relevance: float = 0.5, signal_type: str = None, limit: int = 100, offset: int = 0, created_after: datetime = None) -> list:
+    """Get signals with optional filters, paginated server-side via range().
+
+    created_after pushes the time-window filter into the query so rows
+    outside the window are never transferred.
+    """
     client = get_client()
     query = client.table(config.TABLE_SIGNALS).select(
-        "*, articles(*), companies(*)"
-    ).gte("relevance_score", min_relevance).order("created_at", desc=True).limit(limit)
+        _SIGNAL_COLUMNS
+    ).gte("relevance_score", min_relevance).order("created_at", desc=True).range(
+        offset, offset + limit - 1
+    )
 
     if company_id:
         query = query.eq("company_id", company_id)
@@ -278,6 +473,9 @@ def get_signals(company_id: str = None, min_relevance: float = 0.5, signal_type:
     if signal_type:
         query = query.eq("signal_type", signal_type)
 
+    if created_after:
+        query = query.gte("created_at", created_after.isoformat())
+
     result = query.execute()
     return result.data
 
@@ -285,29 +483,80 @@ def get_signals(company_id: str = None, min_relevance: float = 0.5, signal_type:
 def get_hot_signals(limit: int = 5) -> list:
     """Get top signals by sales_relevance."""
     client = get_client()
+
+    # Prefer the precomputed top-N (see schema.sql) - reads limit rows from
+    # a 100-row materialized view instead of sorting the full signals table
+    # with two joins on every dashboard render
+    try:
+        result = client.table("hot_signals_mv").select("*").order(
+            "sales_relevance", desc=True
+        ).limit(limit).execute()
+        return result.data
+    except Exception:
+        # View may not exist on older deployments - fall back to the live query
+        pass
+
     result = client.table(config.TABLE_SIGNALS).select(
-        "*, articles(*), companies(*)"
+        _SIGNAL_COLUMNS
     ).gte("relevance_score", 0.5).order("sales_relevance", desc=True).limit(limit).execute()
     return result.data
 
 
+def refresh_hot_signals():
+    """Refresh the hot signals materialized view after signal writes.
+
+    Best-effort: a missing view (older deployment) just means readers use
+    the live-query fallback in get_hot_signals.
+    """
+    client = get_client()
+    try:
+        client.rpc("refresh_hot_signals").execute()
+    except Exception as e:
+        # Don't fail the write that triggered the refresh, but make the
+        # stale-view condition visible instead of swallowing it
+        logger.warning(f"hot_signals_mv refresh failed (view may be stale): {e}")
+
+
 def get_company_signal_summary() -> list:
     """Get signal counts by type for each company."""
     client = get_client()
-    # Get all signals with company info
+
+    # Prefer the pre-aggregated view (see schema.sql) - one count row per
+    # company/type instead of one row per signal
+    try:
+        result = client.table("company_signal_summary_v").select(
+            "company_id, name, signal_type, signal_count"
+        ).execute()
+        company_stats = {}
+        for row in result.data:
+            company_id = row["company_id"]
+            if company_id not in company_stats:
+                company_stats[company_id] = {"name": row.get("name") or "Unknown", "total": 0, "by_type": {}}
+            count = row.get("signal_count", 0)
+            company_stats[company_id]["total"] += count
+            company_stats[company_id]["by_type"][row.get("signal_type", "general")] = count
+        return list(company_stats.values())
+    except Exception:
+        # View may not exist on older deployments - fall back to row-level aggregation
+        pass
+
+    # Fetch names once and join locally instead of embedding companies(name)
+    # on every signal row - the payload drops to two scalar fields per row
+    names = {
+        c["id"]: c["name"]
+        for c in client.table(config.TABLE_COMPANIES).select("id, name").execute().data
+    }
     result = client.table(config.TABLE_SIGNALS).select(
-        "company_id, signal_type, companies(name)"
+        "company_id, signal_type"
     ).gte("relevance_score", 0.5).execute()
 
-    # Aggregate in Python (Supabase free tier doesn't support GROUP BY well)
     company_stats = {}
     for row in result.data:
         company_id = row["company_id"]
-        company_name = row["companies"]["name"] if row.get("companies") else "Unknown"
         signal_type = row.get("signal_type", "general")
 
         if company_id not in company_stats:
-            company_stats[company_id] = {"name": company_name, "total": 0, "by_type": {}}
+            company_stats[company_id] = {"name": names.get(company_id, "Unknown"), "total": 0, "by_type": {}}
 
         company_stats[company_id]["total"] += 1
         company_stats[company_id]["by_type"][signal_type] = company_stats[company_id]["by_type"].get(signal_type, 0) + 1
@@ -315,9 +564,16 @@ def get_company_signal_summary() -> list:
     return list(company_stats.values())
 
 
-def get_company_pain_summary(days: int = 7, profile_id: str = None) -> list:
+def get_company_pain_summary(days: int = 7, profile_id: str = None,
+                             exclude_contacted_days: int = 0, exclude_snoozed_days: int = 0) -> list:
     """Get company-level pain summary for outreach prioritization.
 
+    Args:
+        days: Signal time window
+        profile_id: If given, restrict to the profile's companies
+        exclude_contacted_days: Exclude companies contacted within this many days
+        exclude_snoozed_days: Exclude companies snoozed within this many days
+
     Returns list of dicts with:
     - company_id, name, ticker
     - max_pain_score, max_pain_summary (highest pain signal)
@@ -336,17 +592,49 @@ def get_company_pain_summary(days: int = 7, profile_id: str = None) -> list:
         if not profile_company_ids:
             return []
 
+    # Push recently-contacted/snoozed exclusions into the query so hidden
+    # companies' signal rows never cross the wire
+    hidden_ids = []
+    if exclude_contacted_days or exclude_snoozed_days:
+        hidden = get_companies_to_hide(
+            contacted_days=exclude_contacted_days,
+            snoozed_days=exclude_snoozed_days,
+            profile_id=profile_id,
+        )
+        hidden_ids = list(hidden["contacted"] | hidden["snoozed"])
+
+    # Prefer the server-side aggregate (see schema.sql) - one pre-grouped row
+    # per company with the signals nested as JSON, instead of shipping every
+    # signal row and grouping in Python
+    try:
+        params = {"p_days": days}
+        if profile_company_ids is not None:
+            params["p_company_ids"] = list(profile_company_ids)
+        if hidden_ids:
+            params["p_exclude_ids"] = hidden_ids
+        result = client.rpc("company_pain_summary", params).execute()
+        return result.data
+    except Exception:
+        # Function may not exist on older deployments - fall back to
+        # row-level aggregation
+        pass
+
     # Calculate cutoff date
     cutoff = datetime.now(timezone.utc) - timedelta(days=days)
 
     # Get signals within time window with only the fields the UI needs
-    result = client.table(config.TABLE_SIGNALS).select(
+    query = client.table(config.TABLE_SIGNALS).select(
         "id, company_id, summary, signal_type, relevance_score, sales_relevance, created_at, talking_point, articles(url, source), companies(name, ticker)"
-    ).gte("relevance_score", 0.5).gte("created_at", cutoff.isoformat()).execute()
+    ).gte("relevance_score", 0.5).gte("created_at", cutoff.isoformat())
+
+    if hidden_ids:
+        query = query.not_.in_("company_id", hidden_ids)
+
+    result = query.execute()
 
     # Group by company in Python
     company_data = {}
-    now = datetime.now(timezone.utc)
+    now_ts = datetime.now(timezone.utc).timestamp()
 
     for signal in result.data:
         company_id = signal["company_id"]
@@ -355,10 +643,12 @@ def get_company_pain_summary(days: int = 7, profile_id: str = None) -> list:
         if profile_company_ids is not None and company_id not in profile_company_ids:
             continue
 
-        company = signal.get("companies", {})
-
-        if company_id not in company_data:
-            company_data[company_id] = {
+        # Single dict lookup per row; only build the company sub-dict and
+        # the initial entry on first sight of a company
+        entry = company_data.get(company_id)
+        if entry is None:
+            company = signal.get("companies") or {}
+            entry = company_data[company_id] = {
                 "company_id": company_id,
                 "name": company.get("name", "Unknown"),
                 "ticker": company.get("ticker"),
@@ -369,8 +659,9 @@ def get_company_pain_summary(days: int = 7, profile_id: str = None) -> list:
                 "signals": [],
             }
 
-        entry = company_data[company_id]
-        pain_score = signal.get("sales_relevance", 0.5)
+        pain_score = signal.get("sales_relevance")
+        if pain_score is None:
+            pain_score = 0.5
 
         # Update max pain
         if pain_score > entry["max_pain_score"]:
@@ -384,12 +675,12 @@ def get_company_pain_summary(days: int = 7, profile_id: str = None) -> list:
         created_at_str = signal.get("created_at")
         if created_at_str:
             try:
-                created_at = datetime.fromisoformat(created_at_str.replace("Z", "+00:00"))
-                age_hours = (now - created_at).total_seconds() / 3600
-                if age_hours < entry["newest_signal_age_hours"]:
-                    entry["newest_signal_age_hours"] = age_hours
+                age_hours = (now_ts - _iso_ts(created_at_str)) / 3600
             except (ValueError, TypeError):
                 pass
+            else:
+                if age_hours < entry["newest_signal_age_hours"]:
+                    entry["newest_signal_age_hours"] = age_hours
 
         # Add to signals list
         entry["signals"].append(signal)
@@ -420,18 +711,29 @@ def upsert_company_financials(company_id: str, data: dict) -> dict:
     return result.data[0] if result.data else None
 
 
+_FINANCIALS_COLUMNS = "company_id, price_change_7d, price_change_30d, market_cap, market_cap_tier, last_earnings, next_earnings, updated_at"
+
+
 def get_company_financials(company_id: str = None, profile_id: str = None) -> list:
     """Get financials for one or all companies, optionally filtered by profile."""
     client = get_client()
-    query = client.table(config.TABLE_FINANCIALS).select("*")
     if company_id:
-        query = query.eq("company_id", company_id)
-    elif profile_id:
+        result = client.table(config.TABLE_FINANCIALS).select(_FINANCIALS_COLUMNS).eq(
+            "company_id", company_id
+        ).execute()
+        return result.data
+    if profile_id:
         company_ids = get_profile_company_ids(profile_id)
         if not company_ids:
             return []
-        query = query.in_("company_id", company_ids)
-    result = query.execute()
+        rows = []
+        for chunk in _in_chunks(company_ids):
+            result = client.table(config.TABLE_FINANCIALS).select(_FINANCIALS_COLUMNS).in_(
+                "company_id", chunk
+            ).execute()
+            rows.extend(result.data)
+        return rows
+    result = client.table(config.TABLE_FINANCIALS).select(_FINANCIALS_COLUMNS).execute()
     return result.data
 
 
@@ -439,31 +741,53 @@ def get_financials_needing_refresh(hours: int = 24, profile_id: str = None) -> l
     """Get companies with tickers that have stale or missing financials."""
     client = get_client()
 
-    # Get all companies with tickers (scoped to profile if given)
+    profile_company_ids = None
     if profile_id:
-        company_ids = get_profile_company_ids(profile_id)
-        if not company_ids:
+        profile_company_ids = get_profile_company_ids(profile_id)
+        if not profile_company_ids:
             return []
-        companies = client.table(config.TABLE_COMPANIES).select(
-            "id, ticker"
-        ).eq("active", True).in_("id", company_ids).execute()
+
+    # Prefer the server-side staleness check (see schema.sql) - one LEFT JOIN
+    # query instead of two fetches plus a Python timestamp loop
+    try:
+        params = {"p_hours": hours}
+        if profile_company_ids is not None:
+            params["p_company_ids"] = profile_company_ids
+        result = client.rpc("financials_needing_refresh", params).execute()
+        return result.data
+    except Exception:
+        # Function may not exist on older deployments - fall back to the
+        # two-query path
+        pass
+
+    # Get all companies with tickers (scoped to profile if given)
+    if profile_company_ids is not None:
+        company_rows = []
+        for chunk in _in_chunks(profile_company_ids):
+            result = client.table(config.TABLE_COMPANIES).select(
+                "id, ticker"
+            ).eq("active", True).in_("id", chunk).execute()
+            company_rows.extend(result.data)
     else:
-        companies = client.table(config.TABLE_COMPANIES).select("id, ticker").eq("active", True).execute()
+        company_rows = client.table(config.TABLE_COMPANIES).select("id, ticker").eq("active", True).execute().data
 
-    companies_with_tickers = [c for c in companies.data if c.get("ticker")]
+    companies_with_tickers = [c for c in company_rows if c.get("ticker")]
 
     if not companies_with_tickers:
         return []
 
     # Get existing financials
     company_ids = [c["id"] for c in companies_with_tickers]
-    financials = client.table(config.TABLE_FINANCIALS).select("company_id, updated_at").in_("company_id", company_ids).execute()
-
-    # Build lookup of last update times
-    fin_lookup = {f["company_id"]: f["updated_at"] for f in financials.data}
+    fin_lookup = {}
+    for chunk in _in_chunks(company_ids):
+        financials = client.table(config.TABLE_FINANCIALS).select(
+            "company_id, updated_at"
+        ).in_("company_id", chunk).execute()
+        # Build lookup of last update times
+        fin_lookup.update({f["company_id"]: f["updated_at"] for f in financials.data})
 
     # Find companies needing refresh
-    cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+    cutoff_ts = (datetime.now(timezone.utc) - timedelta(hours=hours)).timestamp()
     needs_refresh = []
 
     for company in companies_with_tickers:
@@ -473,8 +797,7 @@ def get_financials_needing_refresh(hours: int = 24, profile_id: str = None) -> l
             needs_refresh.append(company)
         else:
             try:
-                last_update = datetime.fromisoformat(updated_at.replace("Z", "+00:00"))
-                if last_update < cutoff:
+                if _iso_ts(updated_at) < cutoff_ts:
                     needs_refresh.append(company)
             except (ValueError, TypeError):
                 needs_refresh.append(company)
@@ -484,6 +807,8 @@ def get_financials_needing_refresh(hours: int = 24, profile_id: str = None) -> l
 
 # --- Outreach Actions ---
 
+_OUTREACH_COLUMNS = "id, company_id, profile_id, action_type, note, created_at"
+
 def add_outreach_action(company_id: str, action_type: str, note: str = None, profile_id: str = None) -> dict:
     """Log an outreach action for a company, optionally scoped to a profile."""
     client = get_client()
@@ -501,19 +826,69 @@ def add_outreach_action(company_id: str, action_type: str, note: str = None, pro
 def get_outreach_actions(company_id: str, limit: int = 10) -> list:
     """Get recent outreach actions for a company."""
     client = get_client()
-    result = client.table(config.TABLE_OUTREACH).select("*").eq(
+    result = client.table(config.TABLE_OUTREACH).select(_OUTREACH_COLUMNS).eq(
         "company_id", company_id
     ).order("created_at", desc=True).limit(limit).execute()
     return result.data
 
 
+def get_outreach_actions_bulk(company_ids: list) -> dict:
+    """Get recent outreach actions for many companies in one query.
+
+    Returns:
+        dict mapping company_id -> list of actions (newest first)
+    """
+    if not company_ids:
+        return {}
+    client = get_client()
+    actions_by_company = {}
+    for chunk in _in_chunks(company_ids):
+        result = client.table(config.TABLE_OUTREACH).select(_OUTREACH_COLUMNS).in_(
+            "company_id", chunk
+        ).order("created_at", desc=True).execute()
+        for action in result.data:
+            actions_by_company.setdefault(action["company_id"], []).append(action)
+    return actions_by_company
+
+
 def get_last_contact(company_id: str) -> dict:
-    """Get most recent 'contacted' action for a company."""
+    """Get most recent 'contacted' action for a company.
+
+    Callers checking many companies should use get_last_contacts instead
+    of looping this (N+1 round-trips).
+    """
+    result = get_last_contacts([company_id])
+    return result.get(company_id)
+
+
+def get_last_contacts(company_ids: list) -> dict:
+    """Get the most recent 'contacted' action for many companies at once.
+
+    Returns:
+        dict mapping company_id -> latest contacted action (or absent)
+    """
+    if not company_ids:
+        return {}
     client = get_client()
-    result = client.table(config.TABLE_OUTREACH).select("*").eq(
-        "company_id", company_id
-    ).eq("action_type", "contacted").order("created_at", desc=True).limit(1).execute()
-    return result.data[0] if result.data else None
+
+    # Prefer the DISTINCT ON function (see schema.sql): one round-trip
+    # returning exactly one row per contacted company
+    try:
+        result = client.rpc("last_contacts", {"p_company_ids": company_ids}).execute()
+        return {row["company_id"]: row for row in result.data}
+    except Exception:
+        # Function may not exist on older deployments - fall back to one
+        # in_() query and keep the newest row per company here
+        pass
+
+    last_by_company = {}
+    for chunk in _in_chunks(company_ids):
+        result = client.table(config.TABLE_OUTREACH).select(_OUTREACH_COLUMNS).in_(
+            "company_id", chunk
+        ).eq("action_type", "contacted").order("created_at", desc=True).execute()
+        for action in result.data:
+            last_by_company.setdefault(action["company_id"], action)
+    return last_by_company
 
 
 def get_companies_to_hide(contacted_days: int = 7, snoozed_days: int = 7, profile_id: str = None) -> dict:
@@ -523,6 +898,28 @@ def get_companies_to_hide(contacted_days: int = 7, snoozed_days: int = 7, profil
         dict with 'contacted' and 'snoozed' sets of company IDs
     """
     client = get_client()
+
+    # Prefer the server-side filter (see schema.sql): each action type gets
+    # its own cutoff in SQL, so the response is distinct company ids rather
+    # than every action row within the wider window
+    try:
+        params = {"p_contacted_days": contacted_days, "p_snoozed_days": snoozed_days}
+        if profile_id:
+            params["p_profile_id"] = profile_id
+        result = client.rpc("companies_to_hide", params).execute()
+        contacted_ids = set()
+        snoozed_ids = set()
+        for row in result.data:
+            if row["action_type"] == "contacted":
+                contacted_ids.add(row["company_id"])
+            else:
+                snoozed_ids.add(row["company_id"])
+        return {"contacted": contacted_ids, "snoozed": snoozed_ids}
+    except Exception:
+        # Function may not exist on older deployments - fall back to
+        # fetching actions and filtering here
+        pass
+
     cutoff = datetime.now(timezone.utc) - timedelta(days=max(contacted_days, snoozed_days))
 
     query = client.table(config.TABLE_OUTREACH).select(
@@ -536,11 +933,10 @@ def get_companies_to_hide(contacted_days: int = 7, snoozed_days: int = 7, profil
 
     contacted_ids = set()
     snoozed_ids = set()
-    now = datetime.now(timezone.utc)
+    now_ts = datetime.now(timezone.utc).timestamp()
 
     for action in result.data:
-        created = datetime.fromisoformat(action["created_at"].replace("Z", "+00:00"))
-        age_days = (now - created).days
+        age_days = (now_ts - _iso_ts(action["created_at"])) / 86400
 
         if action["action_type"] == "contacted" and age_days < contacted_days:
             contacted_ids.add(action["company_id"])
@@ -590,15 +986,14 @@ def get_outreach_details(contacted_days: int = 7, snoozed_days: int = 7, profile
 
     contacted = []
     snoozed = []
-    now = datetime.now(timezone.utc)
+    now_ts = datetime.now(timezone.utc).timestamp()
 
     # Track seen company IDs to avoid duplicates (keep most recent)
     contacted_seen = set()
     snoozed_seen = set()
 
     for action in result.data:
-        created = datetime.fromisoformat(action["created_at"].replace("Z", "+00:00"))
-        age_days = (now - created).days
+        age_days = (now_ts - _iso_ts(action["created_at"])) / 86400
         company_id = action["company_id"]
         company = action.get("companies", {}) or {}
 
@@ -1,14 +1,17 @@
 # etl.py - Data pipeline: fetch, classify, transform
 # Uses db module for storage, no raw SQL or UI code here
 
-import json
+import io
 import logging
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from urllib.parse import quote_plus
 import xml.etree.ElementTree as ET
 
 import httpx
+import orjson
 import anthropic
 import yfinance as yf
 
@@ -16,6 +19,29 @@ import config
 
 logger = logging.getLogger(__name__)
 
+# Shared HTTP client for RSS fetches - httpx.Client is thread-safe, so the
+# parallel company workers reuse one connection pool instead of paying a
+# fresh TCP+TLS handshake to Google News per fetch
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def _get_http_client() -> httpx.Client:
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = httpx.Client(
+                    timeout=30.0,
+                    limits=httpx.Limits(
+                        max_connections=config.COMPANY_PARALLELISM,
+                        max_keepalive_connections=config.COMPANY_PARALLELISM,
+                        keepalive_expiry=60,
+                    ),
+                    follow_redirects=True,
+                )
+    return _http_client
+
 
 def fetch_news_rss(company_name: str, ticker: str = None) -> list:
     """Fetch news articles from Google News RSS for a company.
@@ -30,34 +56,39 @@ def fetch_news_rss(company_name: str, ticker: str = None) -> list:
 
     url = config.GOOGLE_NEWS_RSS_URL.format(query=quote_plus(query))
 
-    response = httpx.get(url, timeout=30.0)
+    response = _get_http_client().get(url)
     response.raise_for_status()
 
+    # Stream <item> elements with iterparse instead of building the whole
+    # tree: stop as soon as we have MAX_ARTICLES_PER_COMPANY (feeds carry
+    # ~100 items; we keep 10) and clear each element after reading it
     articles = []
-    root = ET.fromstring(response.content)
+    for _, elem in ET.iterparse(io.BytesIO(response.content), events=("end",)):
+        if elem.tag != "item":
+            continue
 
-    for item in root.findall(".//item"):
-        title = item.find("title").text if item.find("title") is not None else ""
-        link = item.find("link").text if item.find("link") is not None else ""
-        source = item.find("source").text if item.find("source") is not None else ""
-        pub_date = item.find("pubDate").text if item.find("pubDate") is not None else ""
+        pub_date = elem.findtext("pubDate", "")
 
-        # Parse date (format: "Mon, 01 Jan 2024 12:00:00 GMT")
+        # Parse RFC-822 date (format: "Mon, 01 Jan 2024 12:00:00 GMT")
         published_at = None
         if pub_date:
             try:
-                published_at = datetime.strptime(pub_date, "%a, %d %b %Y %H:%M:%S %Z")
-            except ValueError:
+                published_at = parsedate_to_datetime(pub_date)
+            except (ValueError, TypeError):
                 pass
 
         articles.append({
-            "title": title,
-            "url": link,
-            "source": source,
+            "title": elem.findtext("title", ""),
+            "url": elem.findtext("link", ""),
+            "source": elem.findtext("source", ""),
             "published_at": published_at,
         })
+        elem.clear()
+
+        if len(articles) >= config.MAX_ARTICLES_PER_COMPANY:
+            break
 
-    return articles[:config.MAX_ARTICLES_PER_COMPANY]
+    return articles
 
 
 def title_mentions_company(title: str, company_name: str, ticker: str = None) -> bool:
@@ -75,8 +106,65 @@ def title_mentions_company(title: str, company_name: str, ticker: str = None) ->
 
 def _is_non_ir_headline(title: str) -> bool:
     """Check if headline matches non-IR keywords that should be forced to neutral."""
-    title_lower = title.lower()
-    return any(kw in title_lower for kw in config.NON_IR_KEYWORDS)
+    return config.NON_IR_PATTERN.search(title) is not None
+
+
+def _non_ir_classification() -> dict:
+    """Classification for headlines the keyword pre-filter rules out.
+
+    These never reach Claude: the keyword match is deterministic, so spending
+    an API call to have the model reach the same neutral verdict (or worse,
+    misclassify it) is pure waste.
+    """
+    return {
+        "summary": "HR, legal, or operational matter — does not create IR team work.",
+        "signal_type": "neutral",
+        "relevance_score": 0.9,
+        "sales_relevance": 0.0,
+    }
+
+
+# Exact-match classification cache. Google News syndicates the same wire
+# story across sources, so identical headlines for a company show up under
+# different URLs (which defeats URL dedup) and were each re-sent to Claude.
+# At CLAUDE_TEMPERATURE=0.1 the classification is effectively deterministic,
+# so repeats can be answered from memory. Keyed on (company, normalized
+# title), bounded, shared safely across the parallel company workers.
+_classification_cache = {}
+_classification_cache_lock = threading.Lock()
+_CLASSIFICATION_CACHE_MAX = 2048
+
+
+def _classification_cache_key(company_name: str, title: str) -> tuple:
+    return (company_name.lower(), " ".join(title.lower().split()))
+
+
+def _classification_cache_get(company_name: str, title: str) -> dict:
+    with _classification_cache_lock:
+        cached = _classification_cache.get(_classification_cache_key(company_name, title))
+        return dict(cached) if cached is not None else None
+
+
+def _classification_cache_put(company_name: str, title: str, classification: dict):
+    entry = {k: v for k, v in classification.items() if k != "article_index"}
+    with _classification_cache_lock:
+        if len(_classification_cache) >= _CLASSIFICATION_CACHE_MAX:
+            # Drop the oldest entry (insertion order) to stay bounded
+            _classification_cache.pop(next(iter(_classification_cache)))
+        _classification_cache[_classification_cache_key(company_name, title)] = entry
+
+
+def _prompt_content(static: str, dynamic: str) -> list:
+    """Build message content with the static prompt prefix marked cacheable.
+
+    The static block is byte-identical across companies, so cache_control lets
+    the API reuse its prefill across calls — cached input tokens bill at ~10%
+    and skip prompt processing. The dynamic block carries the per-call data.
+    """
+    return [
+        {"type": "text", "text": static, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": dynamic},
+    ]
 
 
 def generate_talking_point(company_name: str, signals: list) -> str:
@@ -100,7 +188,7 @@ def generate_talking_point(company_name: str, signals: list) -> str:
 
     client = anthropic.Anthropic()
 
-    prompt = config.TALKING_POINTS_PROMPT.format(
+    dynamic = config.TALKING_POINTS_PROMPT_DYNAMIC.format(
         company_name=company_name,
         signals_block="\n".join(lines),
     )
@@ -109,7 +197,10 @@ def generate_talking_point(company_name: str, signals: list) -> str:
         model=config.CLAUDE_MODEL,
         max_tokens=150,
         temperature=config.CLAUDE_TEMPERATURE,
-        messages=[{"role": "user", "content": prompt}],
+        messages=[{
+            "role": "user",
+            "content": _prompt_content(config.TALKING_POINTS_PROMPT_STATIC, dynamic),
+        }],
     )
 
     return message.content[0].text.strip()
@@ -120,9 +211,16 @@ def classify_article(title: str, source: str, company_name: str) -> dict:
 
     Returns dict with: summary, relevance_score, signal_type, sales_relevance (ir_pain_score)
     """
+    if _is_non_ir_headline(title):
+        return _non_ir_classification()
+
+    cached = _classification_cache_get(company_name, title)
+    if cached is not None:
+        return cached
+
     client = anthropic.Anthropic()
 
-    prompt = config.SIGNAL_CLASSIFICATION_PROMPT.format(
+    dynamic = config.SIGNAL_CLASSIFICATION_PROMPT_DYNAMIC.format(
         company_name=company_name,
         title=title,
         source=source,
@@ -132,7 +230,10 @@ def classify_article(title: str, source: str, company_name: str) -> dict:
         model=config.CLAUDE_MODEL,
         max_tokens=config.CLAUDE_MAX_TOKENS,
         temperature=config.CLAUDE_TEMPERATURE,
-        messages=[{"role": "user", "content": prompt}],
+        messages=[{
+            "role": "user",
+            "content": _prompt_content(config.SIGNAL_CLASSIFICATION_PROMPT_STATIC, dynamic),
+        }],
     )
 
     response_text = message.content[0].text
@@ -141,8 +242,8 @@ def classify_article(title: str, source: str, company_name: str) -> dict:
     result = None
     try:
         # First try: parse the whole response as JSON
-        result = json.loads(response_text)
-    except json.JSONDecodeError:
+        result = orjson.loads(response_text)
+    except orjson.JSONDecodeError:
         # Second try: strip markdown code blocks and parse
         cleaned = response_text.strip()
         if cleaned.startswith("```"):
@@ -150,8 +251,8 @@ def classify_article(title: str, source: str, company_name: str) -> dict:
             lines = cleaned.split("\n")
             cleaned = "\n".join(lines[1:-1] if lines[-1] == "```" else lines[1:])
         try:
-            result = json.loads(cleaned)
-        except json.JSONDecodeError:
+            result = orjson.loads(cleaned)
+        except orjson.JSONDecodeError:
             # Fallback: extract values manually
             result = {
                 "summary": response_text[:200],
@@ -174,12 +275,14 @@ def classify_article(title: str, source: str, company_name: str) -> dict:
         signal_type = "neutral"
         ir_pain_score = 0.0
 
-    return {
+    classification = {
         "summary": result.get("summary", ""),
         "relevance_score": float(result.get("relevance_score", 0.5)),
         "signal_type": signal_type,
         "sales_relevance": float(ir_pain_score),
     }
+    _classification_cache_put(company_name, title, classification)
+    return classification
 
 
 def _parse_batch_response(response_text: str, articles: list) -> list:
@@ -194,16 +297,16 @@ def _parse_batch_response(response_text: str, articles: list) -> list:
     """
     result = None
     try:
-        result = json.loads(response_text)
-    except json.JSONDecodeError:
+        result = orjson.loads(response_text)
+    except orjson.JSONDecodeError:
         # Try stripping markdown code blocks
         cleaned = response_text.strip()
         if cleaned.startswith("```"):
             lines = cleaned.split("\n")
             cleaned = "\n".join(lines[1:-1] if lines[-1] == "```" else lines[1:])
         try:
-            result = json.loads(cleaned)
-        except json.JSONDecodeError:
+            result = orjson.loads(cleaned)
+        except orjson.JSONDecodeError:
             logger.warning("Failed to parse batch classification response")
             return []
 
@@ -253,29 +356,60 @@ def batch_classify_articles(articles: list, company_name: str) -> list:
     if not articles:
         return []
 
+    # Resolve headlines locally where possible (keyword pre-filter, then the
+    # classification cache); only true misses are sent to Claude
+    results = []
+    to_classify = []
+    miss_indices = []  # position in to_classify -> index in articles
+    for i, article in enumerate(articles):
+        if _is_non_ir_headline(article["title"]):
+            classification = _non_ir_classification()
+            classification["article_index"] = i
+            results.append(classification)
+            continue
+        cached = _classification_cache_get(company_name, article["title"])
+        if cached is not None:
+            cached["article_index"] = i
+            results.append(cached)
+        else:
+            to_classify.append(article)
+            miss_indices.append(i)
+
+    if not to_classify:
+        return results
+
     client = anthropic.Anthropic()
 
     # Build headlines block with indices
     headlines_lines = []
-    for i, article in enumerate(articles):
+    for i, article in enumerate(to_classify):
         headlines_lines.append(f"[{i}] {article['title']} (Source: {article['source']})")
 
-    prompt = config.BATCH_CLASSIFICATION_PROMPT.format(
+    dynamic = config.BATCH_CLASSIFICATION_PROMPT_DYNAMIC.format(
         company_name=company_name,
         headlines_block="\n".join(headlines_lines),
     )
 
-    # Scale max tokens based on batch size
-    max_tokens = min(config.CLAUDE_MAX_TOKENS * len(articles), 4000)
+    # Scale max tokens based on batch size (Haiku's output ceiling is 8192)
+    max_tokens = min(config.CLAUDE_MAX_TOKENS * len(to_classify), 8000)
 
     message = client.messages.create(
         model=config.CLAUDE_MODEL,
         max_tokens=max_tokens,
         temperature=config.CLAUDE_TEMPERATURE,
-        messages=[{"role": "user", "content": prompt}],
+        messages=[{
+            "role": "user",
+            "content": _prompt_content(config.BATCH_CLASSIFICATION_PROMPT_STATIC, dynamic),
+        }],
     )
 
-    return _parse_batch_response(message.content[0].text, articles)
+    for c in _parse_batch_response(message.content[0].text, to_classify):
+        miss_article = to_classify[c["article_index"]]
+        _classification_cache_put(company_name, miss_article["title"], c)
+        c["article_index"] = miss_indices[c["article_index"]]
+        results.append(c)
+
+    return results
 
 
 def process_company(company: dict) -> dict:
@@ -295,37 +429,63 @@ def process_company(company: dict) -> dict:
     articles = fetch_news_rss(company["name"], company.get("ticker"))
     stats["articles_fetched"] = len(articles)
 
-    # Batch check which URLs already exist (single DB call)
-    all_urls = [a["url"] for a in articles]
-    existing_urls = db.get_existing_urls(all_urls)
-
-    # Filter to new, relevant articles
-    new_articles = []
-    for article in articles:
-        if article["url"] in existing_urls:
-            continue
-        if not title_mentions_company(article["title"], company["name"], company.get("ticker")):
-            continue
-        new_articles.append(article)
+    # Filter to relevant articles; URL dedup is left to the database - the
+    # upsert's unique-constraint handling is atomic, so there is no separate
+    # existence SELECT and no window for two workers to race on the same URL
+    candidates = [
+        article for article in articles
+        if title_mentions_company(article["title"], company["name"], company.get("ticker"))
+    ]
 
-    if not new_articles:
+    if not candidates:
         return stats
 
-    # Insert articles to DB and build mapping
+    # Insert articles in one batch; only rows that actually landed come back
+    article_rows = [
+        {
+            "company_id": company["id"],
+            "title": article["title"],
+            "url": article["url"],
+            "source": article["source"],
+            "published_at": article["published_at"].isoformat() if article["published_at"] else None,
+        }
+        for article in candidates
+    ]
+
+    try:
+        inserted = db.add_articles_batch(article_rows)
+    except Exception as e:
+        # Fallback: insert individually if batch fails
+        logger.warning(f"Batch article insert failed for {company['name']}, falling back: {e}")
+        inserted = []
+        fetched_at = datetime.now(timezone.utc)  # one timestamp for the whole batch
+        for article in candidates:
+            try:
+                db_article = db.add_article(
+                    company_id=company["id"],
+                    title=article["title"],
+                    url=article["url"],
+                    source=article["source"],
+                    published_at=article["published_at"],
+                    fetched_at=fetched_at,
+                )
+                if db_article:
+                    inserted.append(db_article)
+            except Exception:
+                continue
+
+    # Classify only articles that were actually new
+    inserted_by_url = {row["url"]: row for row in inserted}
+    new_articles = []
     article_db_map = {}  # index -> db_article
-    for i, article in enumerate(new_articles):
-        db_article = db.add_article(
-            company_id=company["id"],
-            title=article["title"],
-            url=article["url"],
-            source=article["source"],
-            published_at=article["published_at"],
-        )
+    for article in candidates:
+        db_article = inserted_by_url.get(article["url"])
         if db_article:
-            article_db_map[i] = db_article
-            stats["articles_new"] += 1
+            article_db_map[len(new_articles)] = db_article
+            new_articles.append(article)
 
-    if not article_db_map:
+    stats["articles_new"] = len(new_articles)
+    if not new_articles:
         return stats
 
     # Batch classify articles (up to BATCH_CLASSIFICATION_SIZE at a time)
@@ -457,6 +617,11 @@ def run_pipeline(profile_id: str = None) -> dict:
                 logger.error(f"Error processing {company.get('name', 'unknown')}: {e}")
                 totals["errors"] += 1
 
+    # Signals only change here, so refresh the precomputed hot-signals
+    # top-N once per run rather than per insert
+    if totals["signals_created"]:
+        db.refresh_hot_signals()
+
     return totals
 
 
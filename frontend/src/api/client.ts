@@ -147,7 +147,7 @@ export async function getHiddenCompanies(
   snoozedDays = 7,
   profileId?: string
 ): Promise<HiddenCompaniesResponse> {
-  const response = await api.get('/api/outreach/hidden', {
+  const response = await api.get('/api/outreach-hidden', {
     params: {
       contacted_days: contactedDays,
       snoozed_days: snoozedDays,
@@ -169,29 +169,58 @@ export async function deleteOutreachAction(
 }
 
 // --- Pipeline ---
+// Pipeline endpoints return 202 with a job record; poll the job until it
+// finishes so callers still get the final stats as before.
+
+interface PipelineJob<T> {
+  job_id: string;
+  status: 'running' | 'done' | 'failed';
+  result: T | null;
+  error: string | null;
+}
+
+const JOB_POLL_INTERVAL_MS = 2000;
+
+async function pollJob<T>(jobId: string): Promise<T> {
+  for (;;) {
+    const response = await api.get<PipelineJob<T>>(`/api/pipeline/jobs/${jobId}`);
+    const job = response.data;
+    if (job.status === 'done') return job.result as T;
+    if (job.status === 'failed') throw new Error(job.error || 'Pipeline job failed');
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+}
 
 export async function runPipeline(profileId?: string): Promise<PipelineStats> {
-  const response = await api.post('/api/pipeline/run', null, {
+  const response = await api.post<PipelineJob<PipelineStats>>('/api/pipeline/run', null, {
     params: profileId ? { profile_id: profileId } : {},
   });
-  return response.data;
+  return pollJob<PipelineStats>(response.data.job_id);
 }
 
 export async function refreshFinancials(profileId?: string): Promise<FinancialsRefreshStats> {
-  const response = await api.post('/api/pipeline/financials', null, {
-    params: profileId ? { profile_id: profileId } : {},
-  });
-  return response.data;
+  const response = await api.post<PipelineJob<FinancialsRefreshStats>>(
+    '/api/pipeline/financials',
+    null,
+    {
+      params: profileId ? { profile_id: profileId } : {},
+    }
+  );
+  return pollJob<FinancialsRefreshStats>(response.data.job_id);
 }
 
 export async function updateAll(profileId?: string): Promise<{
   pipeline: PipelineStats;
   financials: FinancialsRefreshStats;
 }> {
-  const response = await api.post('/api/pipeline/update-all', null, {
+  const response = await api.post<
+    PipelineJob<{ pipeline: PipelineStats; financials: FinancialsRefreshStats }>
+  >('/api/pipeline/update-all', null, {
     params: profileId ? { profile_id: profileId } : {},
   });
-  return response.data;
+  return pollJob<{ pipeline: PipelineStats; financials: FinancialsRefreshStats }>(
+    response.data.job_id
+  );
 }
 
 export async function clearData(): Promise<{ signals: number; articles: number }> {
@@ -46,9 +46,134 @@ CREATE INDEX IF NOT EXISTS idx_signals_company ON signals(company_id);
 CREATE INDEX IF NOT EXISTS idx_signals_relevance ON signals(relevance_score);
 CREATE INDEX IF NOT EXISTS idx_signals_created ON signals(created_at DESC);
 
+-- Partial composite index matching the dashboard's signal feed query:
+-- filter by company, order by created_at DESC, relevance >= 0.5 (the
+-- default threshold) - lets the per-company feed read index order directly
+CREATE INDEX IF NOT EXISTS idx_signals_company_created
+    ON signals(company_id, created_at DESC)
+    WHERE relevance_score >= 0.5;
+
+-- Composite index matching get_signals' default shape: relevance filter
+-- plus created_at ordering in one index range scan
+CREATE INDEX IF NOT EXISTS idx_signals_rel_created
+    ON signals(relevance_score, created_at DESC);
+
+-- Tiny partial index making the hot-signals top-N (and the matview
+-- refresh behind it) an index-order read instead of a full sort
+CREATE INDEX IF NOT EXISTS idx_signals_sales
+    ON signals(sales_relevance DESC)
+    WHERE relevance_score >= 0.5;
+
 -- Add talking_point column for AI-generated outreach openers
 ALTER TABLE signals ADD COLUMN IF NOT EXISTS talking_point TEXT;
 
+-- Pre-aggregated signal counts per company and type, so the summary endpoint
+-- pulls a handful of count rows instead of every signal row
+CREATE OR REPLACE VIEW company_signal_summary_v AS
+SELECT s.company_id,
+       c.name,
+       s.signal_type,
+       COUNT(*) AS signal_count
+FROM signals s
+JOIN companies c ON c.id = s.company_id
+WHERE s.relevance_score >= 0.5
+GROUP BY s.company_id, c.name, s.signal_type;
+
+-- Precomputed "hot signals" top-N: the dashboard reads this on every render
+-- but its contents only change when the pipeline writes signals, so the
+-- join+sort over the full signals table runs once per refresh, not per read.
+-- Nested JSON columns mirror the articles()/companies() embed shape.
+CREATE MATERIALIZED VIEW IF NOT EXISTS hot_signals_mv AS
+SELECT s.id, s.article_id, s.company_id, s.summary, s.signal_type,
+       s.relevance_score, s.sales_relevance, s.talking_point, s.created_at,
+       JSONB_BUILD_OBJECT(
+           'id', a.id, 'title', a.title, 'url', a.url,
+           'source', a.source, 'published_at', a.published_at
+       ) AS articles,
+       JSONB_BUILD_OBJECT('id', c.id, 'name', c.name, 'ticker', c.ticker) AS companies
+FROM signals s
+JOIN articles a ON a.id = s.article_id
+JOIN companies c ON c.id = s.company_id
+WHERE s.relevance_score >= 0.5
+ORDER BY s.sales_relevance DESC
+LIMIT 100;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_hot_signals_mv_id ON hot_signals_mv(id);
+
+-- Called by the pipeline after signal writes; per-insert triggers would
+-- refresh once per row during a batch run. Plain REFRESH (not CONCURRENTLY):
+-- CONCURRENTLY cannot run inside a transaction block, and PostgREST RPCs
+-- always execute in one. The brief lock on a 100-row view is negligible.
+CREATE OR REPLACE FUNCTION refresh_hot_signals()
+RETURNS VOID AS $$
+BEGIN
+    REFRESH MATERIALIZED VIEW hot_signals_mv;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Wipe signals + articles in O(1) via TRUNCATE instead of a row-by-row
+-- DELETE that ships every deleted row back to the client just for counting
+CREATE OR REPLACE FUNCTION clear_signals_and_articles()
+RETURNS TABLE (signals_deleted BIGINT, articles_deleted BIGINT) AS $$
+DECLARE
+    n_signals BIGINT;
+    n_articles BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO n_signals FROM signals;
+    SELECT COUNT(*) INTO n_articles FROM articles;
+    TRUNCATE signals, articles;
+    RETURN QUERY SELECT n_signals, n_articles;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Server-side pain summary: groups the last p_days of signals per company,
+-- with the signal rows nested as JSON, so the dashboard's main query returns
+-- one row per company instead of one row per signal
+CREATE OR REPLACE FUNCTION company_pain_summary(
+    p_days INT DEFAULT 7,
+    p_company_ids UUID[] DEFAULT NULL,
+    p_exclude_ids UUID[] DEFAULT NULL
+)
+RETURNS TABLE (
+    company_id UUID,
+    name TEXT,
+    ticker TEXT,
+    max_pain_score REAL,
+    max_pain_summary TEXT,
+    signal_count BIGINT,
+    newest_signal_age_hours DOUBLE PRECISION,
+    signals JSONB
+) AS $$
+    SELECT s.company_id,
+           c.name,
+           c.ticker,
+           MAX(s.sales_relevance) AS max_pain_score,
+           (ARRAY_AGG(s.summary ORDER BY s.sales_relevance DESC))[1] AS max_pain_summary,
+           COUNT(*) AS signal_count,
+           EXTRACT(EPOCH FROM NOW() - MAX(s.created_at)) / 3600 AS newest_signal_age_hours,
+           JSONB_AGG(JSONB_BUILD_OBJECT(
+               'id', s.id,
+               'company_id', s.company_id,
+               'summary', s.summary,
+               'signal_type', s.signal_type,
+               'relevance_score', s.relevance_score,
+               'sales_relevance', s.sales_relevance,
+               'created_at', s.created_at,
+               'talking_point', s.talking_point,
+               'articles', JSONB_BUILD_OBJECT('url', a.url, 'source', a.source),
+               'companies', JSONB_BUILD_OBJECT('name', c.name, 'ticker', c.ticker)
+           ) ORDER BY s.created_at DESC) AS signals
+    FROM signals s
+    JOIN companies c ON c.id = s.company_id
+    LEFT JOIN articles a ON a.id = s.article_id
+    WHERE s.relevance_score >= 0.5
+      AND s.created_at >= NOW() - MAKE_INTERVAL(days => p_days)
+      AND (p_company_ids IS NULL OR s.company_id = ANY(p_company_ids))
+      AND (p_exclude_ids IS NULL OR NOT s.company_id = ANY(p_exclude_ids))
+    GROUP BY s.company_id, c.name, c.ticker
+    ORDER BY max_pain_score DESC;
+$$ LANGUAGE sql STABLE;
+
 -- Company financials (stock data from yfinance)
 CREATE TABLE IF NOT EXISTS company_financials (
     company_id UUID PRIMARY KEY REFERENCES companies(id) ON DELETE CASCADE,
@@ -61,6 +186,22 @@ CREATE TABLE IF NOT EXISTS company_financials (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Companies whose financials are missing or older than p_hours - replaces a
+-- companies fetch + financials fetch + Python staleness loop with one query
+CREATE OR REPLACE FUNCTION financials_needing_refresh(
+    p_hours INT DEFAULT 24,
+    p_company_ids UUID[] DEFAULT NULL
+)
+RETURNS TABLE (id UUID, ticker TEXT) AS $$
+    SELECT c.id, c.ticker
+    FROM companies c
+    LEFT JOIN company_financials f ON f.company_id = c.id
+    WHERE c.active
+      AND c.ticker IS NOT NULL
+      AND (p_company_ids IS NULL OR c.id = ANY(p_company_ids))
+      AND (f.updated_at IS NULL OR f.updated_at < NOW() - MAKE_INTERVAL(hours => p_hours));
+$$ LANGUAGE sql STABLE;
+
 -- Outreach actions (track contacted, snoozed, notes)
 CREATE TABLE IF NOT EXISTS outreach_actions (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -73,6 +214,11 @@ CREATE TABLE IF NOT EXISTS outreach_actions (
 CREATE INDEX IF NOT EXISTS idx_outreach_company ON outreach_actions(company_id);
 CREATE INDEX IF NOT EXISTS idx_outreach_type ON outreach_actions(action_type);
 
+-- Composite index backing per-company outreach history and the
+-- last_contacts DISTINCT ON query (company, action type, newest first)
+CREATE INDEX IF NOT EXISTS idx_outreach_company_action_created
+    ON outreach_actions(company_id, action_type, created_at DESC);
+
 -- Profiles (territories for salespeople)
 CREATE TABLE IF NOT EXISTS profiles (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -90,6 +236,65 @@ CREATE TABLE IF NOT EXISTS profile_companies (
 CREATE INDEX IF NOT EXISTS idx_profile_companies_profile ON profile_companies(profile_id);
 CREATE INDEX IF NOT EXISTS idx_profile_companies_company ON profile_companies(company_id);
 
+-- Profile-scoped company removal in one round-trip: unlink from the profile,
+-- drop that profile's outreach, and fully delete the company (cascades cover
+-- child rows) only when no other profile still links it. Returns TRUE if
+-- anything was removed.
+CREATE OR REPLACE FUNCTION delete_company_scoped(p_company_id UUID, p_profile_id UUID)
+RETURNS BOOLEAN AS $$
+DECLARE
+    unlinked INT;
+    removed INT;
+BEGIN
+    DELETE FROM profile_companies
+    WHERE profile_id = p_profile_id AND company_id = p_company_id;
+    GET DIAGNOSTICS unlinked = ROW_COUNT;
+
+    DELETE FROM outreach_actions
+    WHERE company_id = p_company_id AND profile_id = p_profile_id;
+
+    DELETE FROM companies c
+    WHERE c.id = p_company_id
+      AND NOT EXISTS (
+          SELECT 1 FROM profile_companies pc WHERE pc.company_id = p_company_id
+      );
+    GET DIAGNOSTICS removed = ROW_COUNT;
+
+    RETURN unlinked > 0 OR removed > 0;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Latest 'contacted' action per company in one round-trip (DISTINCT ON
+-- keeps only the newest row per company) - avoids N+1 per-company lookups
+CREATE OR REPLACE FUNCTION last_contacts(p_company_ids UUID[])
+RETURNS SETOF outreach_actions AS $$
+    SELECT DISTINCT ON (company_id) *
+    FROM outreach_actions
+    WHERE action_type = 'contacted'
+      AND company_id = ANY(p_company_ids)
+    ORDER BY company_id, created_at DESC;
+$$ LANGUAGE sql STABLE;
+
+-- Companies to hide from the dashboard: recently contacted or snoozed, each
+-- with its own window, filtered and deduplicated server-side so the client
+-- receives distinct (company_id, action_type) pairs instead of raw actions
+CREATE OR REPLACE FUNCTION companies_to_hide(
+    p_contacted_days INT DEFAULT 7,
+    p_snoozed_days INT DEFAULT 7,
+    p_profile_id UUID DEFAULT NULL
+)
+RETURNS TABLE (company_id UUID, action_type TEXT) AS $$
+    SELECT DISTINCT o.company_id, o.action_type
+    FROM outreach_actions o
+    WHERE (p_profile_id IS NULL OR o.profile_id = p_profile_id)
+      AND (
+          (o.action_type = 'contacted'
+           AND o.created_at > NOW() - MAKE_INTERVAL(days => p_contacted_days))
+       OR (o.action_type = 'snoozed'
+           AND o.created_at > NOW() - MAKE_INTERVAL(days => p_snoozed_days))
+      );
+$$ LANGUAGE sql STABLE;
+
 -- Add profile_id to outreach_actions for profile-scoped outreach tracking
 ALTER TABLE outreach_actions ADD COLUMN IF NOT EXISTS profile_id UUID REFERENCES profiles(id) ON DELETE CASCADE;
 CREATE INDEX IF NOT EXISTS idx_outreach_profile ON outreach_actions(profile_id);